@@ -1,165 +1,279 @@
-import pandas as pd
-import re
-import arabic_reshaper
-from bidi.algorithm import get_display
+import argparse
+import json
+import os
+import sys
+import time
+from run_report import NULL_REPORT, RunReport, write_reports_json
+from shaping_backends import BACKENDS, DEFAULT_BACKEND, set_backend
+from translation_pipeline import (TranslationPipeline, add_linebreaks, build_variants, convert_special_chars,
+                                  process_text, rearrange_sentences, reshape_arabic, shaping_engine)
+from translation_table import load_table
+from validation import ValidationReport
 
-def process_excel_to_xml(excel_path, xml_path, output_xml_path):
-    # مرحله 1: خواندن فایل اکسل و ایجاد دیکشنری تنظیمات
-    excel_data = pd.read_excel(excel_path, header=None)
-    
-    # ایجاد دیکشنری برای ذخیره IDها و تنظیمات مربوطه
-    id_settings = {}
-    valid_ids = set()
-    
-    # پر کردن دیکشنری تنظیمات از ستون‌های 4,5,6
-    for idx, row in excel_data.iterrows():
-        if len(row) > 6 and pd.notna(row[4]) and pd.notna(row[5]) and pd.notna(row[6]):
-            try:
-                id_val = int(row[4])
-                id_settings[id_val] = {
-                    'min_len': int(row[5]),
-                    'max_len': int(row[6])
-                }
-                valid_ids.add(id_val)
-            except:
-                continue
-    
-    # ایجاد دیکشنری برای نگاشت کلید به ID از ستون‌های 0 و 3
-    key_to_id = {}
-    key_to_text = {}
-    for idx, row in excel_data.iterrows():
-        if len(row) > 3 and pd.notna(row[0]) and pd.notna(row[3]):
-            key_to_id[row[0]] = row[3]
-        if len(row) > 1 and pd.notna(row[0]) and pd.notna(row[1]):
-            key_to_text[row[0]] = row[1]
-    
-    # مرحله 2: پردازش فایل XML
-    with open(xml_path, 'r', encoding='utf-8') as f:
-        xml_content = f.read()
-    
-    # الگو برای یافتن آیتم‌ها
-    item_pattern = re.compile(r'<item\s+key="([^"]+)"\s+value="([^"]*)"\s*/>')
-    
-    # تابع جایگزینی
-    def replace_item(match):
-        key = match.group(1)
-        original_value = match.group(2)
-        
-        # بررسی آیا کلید در اکسل وجود دارد
-        if key in key_to_id:
-            id_val = key_to_id[key]
-            
-            # اگر ID=0 باشد، پردازش بدون محدودیت طول
-            if id_val == 0:
-                text = key_to_text.get(key, original_value)
-                processed_text = process_text(text, 0, 0, "\n")  # min=0, max=0 یعنی بدون محدودیت
-                processed_value = convert_special_chars(processed_text)
-                return f'<item key="{key}" value="{processed_value}" />'
-            
-            # اگر ID معتبر باشد (غیر صفر و در تنظیمات وجود داشته باشد)
-            elif id_val in valid_ids:
-                text = key_to_text.get(key, original_value)
-                settings = id_settings[id_val]
-                processed_text = process_text(text, settings['min_len'], settings['max_len'], "\n")
-                processed_value = convert_special_chars(processed_text)
-                return f'<item key="{key}" value="{processed_value}" />'
-        
-        # اگر نیازی به پردازش نبود، مقدار اصلی را برگردان
-        return match.group(0)
+def process_excel_to_xml(excel_path, xml_path, output_xml_path, refresh_cache=False, engine=None,
+                         stream=False, incremental=False, workers=1, table=None, report=None,
+                         indexed=False, validation=None):
+    # خط لوله مشترک با رابط گرافیکی (load → plan → shape → render → write)؛ در حالت دسته‌ای
+    # جدول ترجمه از قبل ساخته شده است
+    pipeline = TranslationPipeline(xml_path, output_xml_path, engine=engine, stream=stream,
+                                   incremental=incremental, workers=workers, indexed=indexed,
+                                   report=report, validation=validation)
+    pipeline.run(excel_path, refresh_cache=refresh_cache, table=table)
+    print_result(pipeline)
+    print_cache_stats(pipeline.engine)
+
+def print_result(pipeline):
+    print(f"پردازش با موفقیت انجام شد. فایل خروجی: {pipeline.output_xml_path}")
+    if not pipeline.changed:
+        print("محتوای خروجی تغییری نکرد؛ فایل دوباره نوشته نشد")
+    if pipeline.build is not None:
+        build = pipeline.build
+        print(f"بازسازی افزایشی: {build.rebuilt} کلید پردازش شد، {build.reused} کلید از خروجی قبلی استفاده شد")
+
+def print_cache_stats(engine):
+    stats = engine.stats()
+    print(f"کش شکل‌دهی: {stats['hits']} برخورد، {stats['misses']} عدم برخورد")
+
+def load_jobs(jobs_path):
+    """
+    خواندن فایل کارها (JSON): لیستی از {"excel": ..., "xml": ..., "output": ...}
+    مسیرهای نسبی نسبت به پوشه همان فایل در نظر گرفته می‌شوند.
+    """
+    with open(jobs_path, 'r', encoding='utf-8') as f:
+        entries = json.load(f)
     
-    # اعمال جایگزینی‌ها در محتوای XML
-    processed_xml = item_pattern.sub(replace_item, xml_content)
+    base_dir = os.path.dirname(os.path.abspath(jobs_path))
+    return [
+        tuple(os.path.join(base_dir, entry[field]) for field in ("excel", "xml", "output"))
+        for entry in entries
+    ]
+
+def load_workbook(workbooks, excel_path, refresh_cache=False, report=None):
+    # هر فایل اکسل در یک اجرا (و در حالت نظارت تا وقتی تغییر نکرده) فقط یک بار خوانده می‌شود
+    workbook_key = os.path.abspath(excel_path)
+    if workbook_key not in workbooks:
+        with (report or NULL_REPORT).stage('load'):
+            workbooks[workbook_key] = load_table(excel_path, refresh_cache=refresh_cache)
+    return workbooks[workbook_key]
+
+def run_jobs(jobs, refresh_cache=False, stream=False, incremental=False, workers=1, reports=None,
+             workbooks=None, indexed=False, validation=None, fan_out=False):
+    """
+    اجرای چند کار (اکسل، XML ورودی، XML خروجی) در یک پروسه.
+    وابستگی‌ها و کش شکل‌دهی یک بار بارگذاری می‌شوند و هر فایل اکسل فقط یک بار خوانده می‌شود.
+    اگر reports یک لیست باشد، برای هر کار یک RunReport ساخته و به آن اضافه می‌شود.
+    workbooks (مسیر مطلق اکسل → جدول ترجمه) می‌تواند بین چند فراخوانی نگه داشته شود.
+    با fan_out کارهای با XML ورودی یکسان با هم ساخته می‌شوند (run_variants).
+    تعداد کارهای ناموفق را برمی‌گرداند.
+    """
+    if workbooks is None:
+        workbooks = {}
+    if fan_out:
+        return run_variants(jobs, refresh_cache=refresh_cache, incremental=incremental, workers=workers,
+                            reports=reports, workbooks=workbooks, validation=validation)
+    failed = 0
+    total_start = time.perf_counter()
     
-    # ذخیره فایل خروجی
-    with open(output_xml_path, 'w', encoding='utf-8') as f:
-        f.write(processed_xml)
+    for index, (excel_path, xml_path, output_xml_path) in enumerate(jobs, 1):
+        print(f"[{index}/{len(jobs)}] {excel_path} + {xml_path} → {output_xml_path}")
+        start = time.perf_counter()
+        report = None
+        if reports is not None:
+            report = RunReport()
+            report.info['job'] = {'excel': excel_path, 'xml': xml_path, 'output': output_xml_path}
+            reports.append(report)
+            report.start()
+        try:
+            table = load_workbook(workbooks, excel_path, refresh_cache, report)
+            process_excel_to_xml(excel_path, xml_path, output_xml_path, stream=stream,
+                                 incremental=incremental, workers=workers, table=table, report=report,
+                                 indexed=indexed, validation=validation)
+        except Exception as e:
+            failed += 1
+            print(f"خطا در پردازش: {e}")
+            if report is not None:
+                report.info['error'] = str(e)
+                report.stop()
+        print(f"زمان: {time.perf_counter() - start:.3f}s")
+        if report is not None:
+            print(report.format_text())
     
-    print(f"پردازش با موفقیت انجام شد. فایل خروجی: {output_xml_path}")
+    if len(jobs) > 1:
+        print(f"مجموع: {len(jobs) - failed}/{len(jobs)} کار موفق در {time.perf_counter() - total_start:.3f}s")
+    return failed
 
-def process_text(text, min_len, max_len, linebreaker):
-    if pd.isna(text):
-        return ""
-    
-    text = str(text) if isinstance(text, (int, float)) else text
+def run_variants(jobs, refresh_cache=False, incremental=False, workers=1, reports=None, workbooks=None,
+                 validation=None):
+    """
+    حالت چندنسخه‌ای: کارهایی که XML ورودی یکسان دارند (مثلاً نسخه‌های فارسی، عربی و آزمایشی
+    english_Original.xml) با build_variants از یک شاخص مشترک ساخته می‌شوند و متن‌های همه
+    نسخه‌ها با هم شکل‌دهی می‌شوند. تعداد کارهای ناموفق را برمی‌گرداند.
+    """
+    groups = {}
+    for job in jobs:
+        groups.setdefault(os.path.abspath(job[1]), []).append(job)
     
-    # اگر min=0 و max=0 باشد، تقسیم خط انجام نمی‌شود
-    if min_len > 0 and max_len > 0 and max_len > min_len:
-        processed_text = add_linebreaks(text, min_len, max_len, linebreaker)
-    else:
-        processed_text = text
+    failed = 0
+    total_start = time.perf_counter()
+    for xml_path, group in groups.items():
+        print(f"{xml_path} → {len(group)} نسخه: {', '.join(output for _, _, output in group)}")
+        start = time.perf_counter()
+        group_report = None
+        group_reports = None
+        if reports is not None:
+            # گزارش مراحل مشترک گروه (index و plan) جدا از گزارش هر نسخه
+            group_report = RunReport()
+            group_report.info['variants'] = {'xml': xml_path, 'outputs': [output for _, _, output in group]}
+            group_report.start()
+            reports.append(group_report)
+            group_reports = []
+            for excel_path, _, output_xml_path in group:
+                report = RunReport()
+                report.info['job'] = {'excel': excel_path, 'xml': xml_path, 'output': output_xml_path}
+                report.start()
+                group_reports.append(report)
+            reports.extend(group_reports)
+        try:
+            tables = [
+                load_workbook(workbooks, excel_path, refresh_cache, group_reports[position] if group_reports else None)
+                for position, (excel_path, _, _) in enumerate(group)
+            ]
+            pipelines = build_variants(xml_path, [(excel_path, output) for excel_path, _, output in group],
+                                       workers=workers, incremental=incremental, tables=tables,
+                                       reports=group_reports, validation=validation, report=group_report)
+            for pipeline in pipelines:
+                print_result(pipeline)
+            print_cache_stats(shaping_engine)
+        except Exception as e:
+            failed += len(group)
+            print(f"خطا در پردازش: {e}")
+            for report in ([group_report] + group_reports) if reports is not None else ():
+                report.info['error'] = str(e)
+                report.stop()
+        print(f"زمان: {time.perf_counter() - start:.3f}s")
+        if group_report is not None:
+            print("مراحل مشترک نسخه‌ها:")
+            print(group_report.format_text())
+        for report in group_reports or ():
+            print(report.format_text())
     
-    # اصلاح حروف عربی/فارسی
-    processed_text = reshape_arabic(processed_text)
+    if len(groups) > 1:
+        print(f"مجموع: {len(jobs) - failed}/{len(jobs)} کار موفق در {time.perf_counter() - total_start:.3f}s")
+    return failed
+
+def write_validation(validation, path):
+    validation.write(path)
+    print(validation.summary())
+    print(f"گزارش کنترل کیفیت در {path} ذخیره شد")
+
+def watch_jobs(jobs, stream=False, workers=1, reports=None, workbooks=None, indexed=False,
+               validate_path=None, fan_out=False):
+    """
+    حالت نظارت: با هر ذخیره فایل اکسل یا XML ورودی، کارهای وابسته به آن دوباره اجرا می‌شوند.
+    نگاشت‌های اکسل‌های تغییرنکرده و کش شکل‌دهی در حافظه گرم می‌مانند و به کمک بازسازی
+    افزایشی فقط کلیدهای تغییرکرده دوباره شکل‌دهی می‌شوند. با Ctrl+C متوقف می‌شود.
+    """
+    from file_watcher import FileWatcher
     
-    # معکوس کردن جملات
-    processed_text = rearrange_sentences(processed_text, linebreaker)
+    if workbooks is None:
+        workbooks = {}
+    watcher = FileWatcher([path for job in jobs for path in job[:2]])
+    outputs = [job[2] for job in jobs]
     
-    return processed_text
+    print("در حال نظارت بر تغییر فایل‌ها (برای خروج Ctrl+C)...")
+    try:
+        while True:
+            changed = set(watcher.wait())
+            for path in changed:
+                workbooks.pop(path, None)
+            
+            affected = [
+                job for job in jobs
+                if os.path.abspath(job[0]) in changed or os.path.abspath(job[1]) in changed
+            ]
+            validation = ValidationReport() if validate_path else None
+            run_jobs(affected, stream=stream, incremental=True, workers=workers, reports=reports,
+                     workbooks=workbooks, indexed=indexed, validation=validation, fan_out=fan_out)
+            if validation is not None:
+                write_validation(validation, validate_path)
+            # خروجی‌ای که خودش ورودی کار دیگری است نباید دوباره اجرا را شروع کند
+            watcher.reset(outputs)
+    except KeyboardInterrupt:
+        print("نظارت متوقف شد")
 
-def add_linebreaks(text, min_len, max_len, linebreaker):
-    arabic_regex = re.compile(r'[\u0600-\u08FF\uFB50-\uFEFF]')
-    output_lines = []
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="پردازش فایل‌های XML بازی Tooth and Tail بر اساس فایل اکسل ترجمه")
+    parser.add_argument("--job", nargs=3, action="append", default=[], metavar=("EXCEL", "XML", "OUTPUT"),
+                        help="یک کار: فایل اکسل، XML ورودی و XML خروجی (قابل تکرار)")
+    parser.add_argument("--jobs", metavar="JOBS_JSON",
+                        help='فایل JSON شامل لیست کارها: [{"excel": ..., "xml": ..., "output": ...}]')
+    parser.add_argument("--refresh-cache", action="store_true", help="نادیده گرفتن کش اکسل")
+    parser.add_argument("--stream", action="store_true", help="خواندن و نوشتن جریانی فایل XML")
+    parser.add_argument("--incremental", action="store_true", help="فقط پردازش کلیدهای تغییرکرده")
+    parser.add_argument("--workers", type=int, default=1, help="تعداد پروسه‌های شکل‌دهی (0 یعنی همه هسته‌ها)")
+    parser.add_argument("--report", action="store_true", help="نمایش زمان هر مرحله، شمارنده‌ها و کندترین کلیدها")
+    parser.add_argument("--report-json", metavar="PATH", help="ذخیره گزارش مراحل به صورت JSON")
+    parser.add_argument("--profile", metavar="PATH", help="اجرا با cProfile و ذخیره آمار در PATH")
+    parser.add_argument("--index", action="store_true",
+                        help="استفاده از شاخص بایتی XML ورودی (فایل کناری .index) به جای regex روی کل فایل")
+    parser.add_argument("--validate", metavar="PATH",
+                        help="ذخیره گزارش کنترل کیفیت (خطوط بلند، شکستن اجباری، کلید غایب، ID بدون تنظیمات) در CSV یا JSON")
+    parser.add_argument("--watch", action="store_true",
+                        help="بعد از اجرای اول، با هر ذخیره فایل اکسل یا XML ورودی خروجی را دوباره بساز")
+    parser.add_argument("--fan-out", action="store_true",
+                        help="کارهای با XML ورودی یکسان (چند نسخه ترجمه) با یک شاخص مشترک و شکل‌دهی مشترک ساخته شوند")
+    parser.add_argument("--serve", metavar="ADDRESS", nargs="?", const="127.0.0.1:8765",
+                        help="اجرای سرویس HTTP/JSON شکل‌دهی برای ابزارهای دیگر "
+                             "(host:port یا unix:/path/to.sock؛ پیش‌فرض 127.0.0.1:8765)")
+    parser.add_argument("--shaping-backend", choices=sorted(BACKENDS), default=DEFAULT_BACKEND,
+                        help="مسیر شکل‌دهی خطوط فارسی: persian (جدول سریع با بازگشت به کتابخانه‌ها) "
+                             "یا library (همیشه arabic_reshaper و python-bidi)؛ خروجی هر دو یکسان است")
+    args = parser.parse_args(argv)
+    set_backend(args.shaping_backend)
     
-    for line in str(text).splitlines():
-        if arabic_regex.search(line):
-            parts = []
-            while len(line) > max_len:
-                split_pos = line.rfind(' ', min_len, max_len)
-                if split_pos == -1:
-                    split_pos = max_len
-                parts.append(line[:split_pos])
-                line = line[split_pos:].lstrip()
-            parts.append(line)
-            line = linebreaker.join(parts)
-        output_lines.append(line)
+    if args.serve:
+        # حالت سرویس: موتور شکل‌دهی و کش آن بین درخواست‌ها گرم می‌ماند؛ کاری اجرا نمی‌شود
+        from shaping_server import serve
+        serve(args.serve, shaping_engine)
+        return 0
     
-    return '\n'.join(output_lines)
-
-def reshape_arabic(text):
-    arabic_regex = re.compile(r'[\u0600-\u08FF\uFB50-\uFEFF]')
-    output_lines = []
+    jobs = [tuple(job) for job in args.job]
+    if args.jobs:
+        jobs.extend(load_jobs(args.jobs))
+    if not jobs:
+        # مسیرهای پیش‌فرض: فایل اکسل، XML ورودی و XML خروجی
+        jobs = [("Book1.xlsx", "english_Original.xml", "english.xml")]
     
-    for line in str(text).splitlines():
-        if arabic_regex.search(line):
-            reshaped = arabic_reshaper.reshape(line)
-            line = get_display(reshaped)
-        output_lines.append(line)
+    reports = [] if args.report or args.report_json else None
+    profiler = None
+    if args.profile:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
     
-    return '\n'.join(output_lines)
-
-def rearrange_sentences(text, linebreaker):
-    arabic_regex = re.compile(r'[\u0600-\u08FF\uFB50-\uFEFF]')
-    output_lines = []
+    workbooks = {}
+    validation = ValidationReport() if args.validate else None
+    failed = run_jobs(jobs, refresh_cache=args.refresh_cache, stream=args.stream,
+                      incremental=args.incremental or args.watch, workers=args.workers, reports=reports,
+                      workbooks=workbooks, indexed=args.index, validation=validation, fan_out=args.fan_out)
+    if validation is not None:
+        write_validation(validation, args.validate)
+    if args.watch:
+        watch_jobs(jobs, stream=args.stream, workers=args.workers, reports=reports, workbooks=workbooks,
+                   indexed=args.index, validate_path=args.validate, fan_out=args.fan_out)
+        failed = 0
     
-    for line in str(text).splitlines():
-        if arabic_regex.search(line):
-            sentences = [s.strip() for s in line.split(linebreaker) if s.strip()]
-            sentences.reverse()
-            line = linebreaker.join(sentences)
-        output_lines.append(line)
+    if profiler is not None:
+        import pstats
+        profiler.disable()
+        profiler.dump_stats(args.profile)
+        print(f"آمار cProfile در {args.profile} ذخیره شد؛ پرهزینه‌ترین توابع:")
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(15)
     
-    return '\n'.join(output_lines)
-
-def convert_special_chars(text):
-    """
-    تبدیل کاراکترهای خاص به entityهای XML با ترتیب صحیح
-    """
-    if not isinstance(text, str):
-        text = str(text)
+    if args.report_json:
+        write_reports_json(reports, args.report_json)
     
-    return (
-        text
-        .replace("&", "&amp;")  # اول از همه
-        .replace("<", "&lt;")
-        .replace(">", "&gt;")
-        .replace('"', "&quot;")
-        .replace("'", "&apos;")
-        .replace("\n", "&#10;")  # در انتها
-    )
+    return 1 if failed else 0
 
 if __name__ == "__main__":
-    excel_path = "Book1.xlsx"  # مسیر فایل اکسل
-    xml_path = "english_Original.xml"   # مسیر فایل XML ورودی
-    output_xml_path = "english.xml"  # مسیر فایل XML خروجی
-    
-    process_excel_to_xml(excel_path, xml_path, output_xml_path)
\ No newline at end of file
+    sys.exit(main())
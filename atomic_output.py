@@ -0,0 +1,110 @@
+import hashlib
+import json
+import os
+import tempfile
+
+from run_report import NULL_REPORT
+
+# اندازه بافر نوشتن فایل موقت (بایت)
+BUFFER_SIZE = 1 << 20
+
+
+class AtomicOutput:
+    """
+    نوشتن اتمیک فایل خروجی: محتوا در یک فایل موقت کنار خروجی (همان پوشه، پس همان
+    فایل‌سیستم) نوشته و در پایان با os.replace جایگزین می‌شود؛ اگر اجرا وسط کار متوقف
+    شود فایل خروجی قبلی سالم می‌ماند.
+    اگر محتوای جدید با خروجی موجود یکی باشد (اندازه و هش sha256)، فایل موقت حذف می‌شود
+    و خروجی دست نمی‌خورد تا زمان تغییر آن برای کش بازی و بسته‌ساز ثابت بماند.
+    بایت‌های نوشته‌شده و ردشده با شمارنده‌های bytes_written و bytes_skipped در report ثبت می‌شوند.
+
+        with AtomicOutput(output_xml_path, 'w', report) as output:
+            output.file.write(text)
+        output.changed  # False یعنی خروجی از قبل همین محتوا را داشت
+    """
+
+    def __init__(self, output_path, mode='w', report=NULL_REPORT):
+        self.output_path = output_path
+        self.mode = mode
+        self.report = report
+        self.file = None
+        self.changed = None
+        self._tmp_path = None
+
+    def __enter__(self):
+        output_dir = os.path.dirname(os.path.abspath(self.output_path))
+        fd, self._tmp_path = tempfile.mkstemp(dir=output_dir, suffix=".tmp")
+        try:
+            if 'b' in self.mode:
+                self.file = os.fdopen(fd, self.mode, buffering=BUFFER_SIZE)
+            else:
+                self.file = os.fdopen(fd, self.mode, buffering=BUFFER_SIZE, encoding='utf-8')
+        except BaseException:
+            os.close(fd)
+            os.unlink(self._tmp_path)
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            self.file.close()
+            if exc_type is None:
+                self._commit()
+        finally:
+            if os.path.exists(self._tmp_path):
+                os.unlink(self._tmp_path)
+        return False
+
+    def _commit(self):
+        size = os.path.getsize(self._tmp_path)
+        if _same_content(self._tmp_path, self.output_path, size):
+            self.changed = False
+            self.report.count('bytes_skipped', size)
+            return
+        _copy_mode(self.output_path, self._tmp_path)
+        os.replace(self._tmp_path, self.output_path)
+        self.changed = True
+        self.report.count('bytes_written', size)
+
+
+def save_json(path, data):
+    """
+    ذخیره اتمیک فایل‌های JSON کناری (کش اکسل، شاخص XML، manifest بازسازی افزایشی) با
+    AtomicOutput. این فایل‌ها فقط اجرای بعدی را سریع‌تر می‌کنند، پس خطای دیسک یا پوشه
+    فقط‌خواندنی نادیده گرفته می‌شود؛ برگشتی False یعنی فایل ذخیره نشد.
+    """
+    try:
+        with AtomicOutput(path, 'w') as output:
+            json.dump(data, output.file, ensure_ascii=False, separators=(',', ':'))
+    except OSError:
+        return False
+    return True
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(BUFFER_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _same_content(tmp_path, output_path, size):
+    # مقایسه اندازه ارزان است و در بیشتر تغییرها هش کردن را لازم نمی‌کند
+    try:
+        if os.path.getsize(output_path) != size:
+            return False
+        return file_sha256(output_path) == file_sha256(tmp_path)
+    except OSError:
+        return False
+
+
+def _copy_mode(output_path, tmp_path):
+    # mkstemp فایل را با دسترسی 600 می‌سازد؛ دسترسی خروجی باید مثل open() معمولی بماند
+    if os.path.exists(output_path):
+        mode = os.stat(output_path).st_mode & 0o7777
+    else:
+        umask = os.umask(0)
+        os.umask(umask)
+        mode = 0o666 & ~umask
+    os.chmod(tmp_path, mode)
@@ -0,0 +1,94 @@
+"""
+مقایسه روش‌های escape مقادیر XML روی خروجی شکل‌دهی‌شده english_Original.xml:
+زنجیره replace قبلی convert_special_chars، str.translate، re.sub با نگاشت،
+xml_escape.escape_value و escape گروهی xml_escape.escape_values.
+
+اجرا:
+    python benchmarks/bench_escape.py
+    python benchmarks/bench_escape.py --repeat 500
+"""
+import argparse
+import html
+import os
+import re
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from xml_escape import ESCAPES, escape_value, escape_values
+from xml_processor import process_text
+from xml_rewriter import item_pattern
+
+TRANSLATE_TABLE = {ord(char): entity for char, entity in ESCAPES}
+ENTITIES = dict(ESCAPES)
+SPECIAL_PATTERN = re.compile('[&<>"\'\n]')
+
+
+def legacy_convert_special_chars(text):
+    # نسخه قبلی convert_special_chars
+    return (
+        text.replace("&", "&amp;")
+        .replace("<", "&lt;")
+        .replace(">", "&gt;")
+        .replace('"', "&quot;")
+        .replace("'", "&apos;")
+        .replace("\n", "&#10;")
+    )
+
+
+def translate_escape(text):
+    return text.translate(TRANSLATE_TABLE)
+
+
+def regex_escape(text):
+    return SPECIAL_PATTERN.sub(lambda match: ENTITIES[match.group()], text)
+
+
+def load_values():
+    # مقادیر اصلی (بدون entity) با چیدمان یک ID معمولی شکل‌دهی می‌شوند تا شامل \n هم باشند
+    with open(os.path.join(ROOT, "english_Original.xml"), 'r', encoding='utf-8') as f:
+        content = f.read()
+    return [process_text(html.unescape(match.group(2)), 26, 32, "\n") for match in item_pattern.finditer(content)]
+
+
+def timed(func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    values = load_values()
+    expected = [legacy_convert_special_chars(value) for value in values]
+    special = sum(1 for value in values if SPECIAL_PATTERN.search(value))
+    print(f"مقادیر: {len(values)} ({special} مقدار دارای کاراکتر خاص)")
+
+    cases = [
+        ("replace قبلی", lambda: [legacy_convert_special_chars(value) for value in values]),
+        ("str.translate", lambda: [translate_escape(value) for value in values]),
+        ("re.sub + نگاشت", lambda: [regex_escape(value) for value in values]),
+        ("escape_value", lambda: [escape_value(value) for value in values]),
+        ("escape_values", lambda: escape_values(values)),
+    ]
+    baseline = None
+    for name, func in cases:
+        if func() != expected:
+            print(f"خطا: خروجی {name} با convert_special_chars یکسان نیست")
+            sys.exit(1)
+        elapsed = timed(func, args.repeat)
+        baseline = baseline or elapsed
+        print(f"{name:<16} {elapsed * 1000:8.3f}ms  {baseline / elapsed:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+مقایسه بارگذار ستونی اکسل با حلقه قدیمی iterrows روی یک کاربرگ مصنوعی.
+با --xlsx خواندن کامل فایل هم مقایسه می‌شود: pd.read_excel، openpyxl جریانی (read-only)
+و خروجی CSV همان جدول.
+
+اجرا:
+    python benchmarks/bench_excel_loader.py --rows 100000
+    python benchmarks/bench_excel_loader.py --rows 100000 --xlsx synthetic.xlsx
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from excel_loader import (load_excel_mappings, read_delimited_mappings, read_pandas_mappings,
+                          read_xlsx_mappings)
+
+
+def legacy_load(excel_data):
+    # نسخه قبلی process_excel_to_xml برای مقایسه
+    id_settings = {}
+    valid_ids = set()
+    key_to_id = {}
+    key_to_text = {}
+
+    for idx, row in excel_data.iterrows():
+        if len(row) > 6 and pd.notna(row[4]) and pd.notna(row[5]) and pd.notna(row[6]):
+            try:
+                id_val = int(row[4])
+                id_settings[id_val] = {
+                    'min_len': int(row[5]),
+                    'max_len': int(row[6])
+                }
+                valid_ids.add(id_val)
+            except:
+                continue
+
+        if len(row) > 3 and pd.notna(row[0]) and pd.notna(row[3]):
+            key_to_id[row[0]] = row[3]
+
+        if len(row) > 1 and pd.notna(row[0]) and pd.notna(row[1]):
+            key_to_text[row[0]] = row[1]
+
+    return id_settings, valid_ids, key_to_id, key_to_text
+
+
+def synthetic_sheet(rows, seed=0):
+    # همان چیدمان Book1.xlsx: کلید، متن، ستون خالی، ID و جدول تنظیمات
+    rng = np.random.default_rng(seed)
+    keys = np.array([f"Key_{i % (rows - rows // 50)}" for i in range(rows)], dtype=object)
+    texts = np.array([f"متن نمونه شماره {i}" for i in range(rows)], dtype=object)
+    texts[rng.random(rows) < 0.02] = None
+    ids = rng.integers(0, 60, rows).astype(float)
+    ids[rng.random(rows) < 0.1] = np.nan
+
+    settings = np.full((rows, 3), np.nan)
+    count = min(50, rows)
+    settings[:count, 0] = np.arange(count)
+    settings[:count, 1] = rng.integers(10, 30, count)
+    settings[:count, 2] = settings[:count, 1] + rng.integers(5, 20, count)
+
+    return pd.DataFrame({
+        0: keys,
+        1: texts,
+        2: np.full(rows, np.nan),
+        3: ids,
+        4: settings[:, 0],
+        5: settings[:, 1],
+        6: settings[:, 2],
+    })
+
+
+def timed(func, *args, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def compare_file_loaders(xlsx_path, excel_data, repeat):
+    csv_path = os.path.splitext(xlsx_path)[0] + ".csv"
+    excel_data.to_csv(csv_path, header=False, index=False)
+
+    pandas_time, pandas_result = timed(read_pandas_mappings, xlsx_path, repeat=repeat)
+    stream_time, stream_result = timed(read_xlsx_mappings, xlsx_path, repeat=repeat)
+    csv_time, csv_result = timed(read_delimited_mappings, csv_path, ",", repeat=repeat)
+
+    if not (pandas_result == stream_result == csv_result):
+        print("خطا: خروجی بارگذارهای فایل یکسان نیست")
+        sys.exit(1)
+
+    print(f"pd.read_excel:  {pandas_time:.3f}s")
+    print(f"openpyxl جریانی: {stream_time:.3f}s  ({pandas_time / stream_time:.1f}x)")
+    print(f"CSV:            {csv_time:.3f}s  ({pandas_time / csv_time:.1f}x)")
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--xlsx", help="ذخیره کاربرگ مصنوعی و خواندن دوباره آن با pd.read_excel")
+    args = parser.parse_args()
+
+    excel_data = synthetic_sheet(args.rows)
+    if args.xlsx:
+        excel_data.to_excel(args.xlsx, header=False, index=False)
+        excel_data = pd.read_excel(args.xlsx, header=None)
+        compare_file_loaders(args.xlsx, excel_data, args.repeat)
+
+    legacy_time, legacy_result = timed(legacy_load, excel_data, repeat=args.repeat)
+    new_time, new_result = timed(load_excel_mappings, excel_data, repeat=args.repeat)
+
+    if legacy_result != new_result:
+        print("خطا: خروجی بارگذار جدید با حلقه قدیمی یکسان نیست")
+        sys.exit(1)
+
+    print(f"ردیف‌ها:        {args.rows}")
+    print(f"iterrows:       {legacy_time:.3f}s")
+    print(f"ستونی:          {new_time:.3f}s")
+    print(f"افزایش سرعت:    {legacy_time / new_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
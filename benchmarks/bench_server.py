@@ -0,0 +1,122 @@
+"""
+مقایسه توان عملیاتی سرویس شکل‌دهی (shaping_server) با روش فعلی ابزارهای دیگر، یعنی اجرای
+یک پروسه پایتون جدید برای هر متن (import دوباره کتابخانه‌ها در هر فراخوانی).
+متن‌ها مقادیر english_Original.xml با چیدمان یک ID معمولی به‌علاوه ترجمه‌های فارسی فایل
+اکسل (--xlsx) با چیدمان ID خودشان هستند؛ خروجی سرویس با process_text مقایسه می‌شود.
+
+اجرا:
+    python benchmarks/bench_server.py
+    python benchmarks/bench_server.py --batch 500 --subprocess-calls 10 --xlsx Book1.xlsx
+"""
+import argparse
+import html
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from No_Gui import process_text
+from shaping_server import ShapingClient, make_server
+from text_shaper import ShapingEngine
+from translation_table import load_table
+from xml_escape import escape_value
+from xml_rewriter import item_pattern
+
+MIN_LEN, MAX_LEN = 26, 32
+
+# اسکریپت هر فراخوانی پروسه جدا: متن از stdin، خروجی escape شده در stdout
+SUBPROCESS_SCRIPT = (
+    "import sys; from No_Gui import process_text, convert_special_chars; "
+    "sys.stdout.write(convert_special_chars(process_text(sys.stdin.read(), int(sys.argv[1]), int(sys.argv[2]), '\\n')))"
+)
+
+
+def load_items(excel_path):
+    with open(os.path.join(ROOT, "english_Original.xml"), 'r', encoding='utf-8') as f:
+        content = f.read()
+    items = [(html.unescape(match.group(2)), MIN_LEN, MAX_LEN) for match in item_pattern.finditer(content)]
+
+    table = load_table(excel_path)
+    for text, min_len, max_len in zip(table.texts, table.min_lens, table.max_lens):
+        if text is not None and min_len is not None:
+            items.append((text, min_len, max_len))
+    return items
+
+
+def bench_subprocess(items, calls):
+    # زمان هر فراخوانی از چند فراخوانی (متن‌های فارسی آخر لیست) اندازه‌گیری و برای کل متن‌ها برون‌یابی می‌شود
+    env = dict(os.environ, PYTHONIOENCODING='utf-8')
+    start = time.perf_counter()
+    for text, min_len, max_len in items[-calls:]:
+        result = subprocess.run(
+            [sys.executable, "-c", SUBPROCESS_SCRIPT, str(min_len), str(max_len)],
+            input=str(text).encode('utf-8'), capture_output=True, cwd=ROOT, env=env, check=True,
+        )
+        if result.stdout.decode('utf-8') != escape_value(process_text(str(text), min_len, max_len, "\n")):
+            print("خطا: خروجی پروسه جدا با process_text یکسان نیست")
+            sys.exit(1)
+    return (time.perf_counter() - start) / calls
+
+
+def bench_server(address, items, batch, expected):
+    # اجرای اول کش سرد (هر متن یکتا یک بار شکل‌دهی می‌شود) و اجرای دوم کش گرم
+    server = make_server(address, ShapingEngine(process_text))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    client = ShapingClient(address)
+    try:
+        timings = []
+        for _ in range(2):
+            start = time.perf_counter()
+            results = []
+            for offset in range(0, len(items), batch):
+                results.extend(client.shape(items[offset:offset + batch], escape=True))
+            timings.append(time.perf_counter() - start)
+            if results != expected:
+                print(f"خطا: خروجی سرویس ({address}) با process_text یکسان نیست")
+                sys.exit(1)
+        return timings
+    finally:
+        client.close()
+        server.shutdown()
+        server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch", type=int, default=200, help="تعداد متن در هر درخواست")
+    parser.add_argument("--subprocess-calls", type=int, default=20, help="تعداد فراخوانی پروسه جدا برای اندازه‌گیری")
+    parser.add_argument("--xlsx", default=os.path.join(ROOT, "Book1.xlsx"), help="فایل اکسل ترجمه")
+    args = parser.parse_args()
+
+    items = load_items(args.xlsx)
+    expected = [escape_value(process_text(*item, "\n")) for item in items]
+    print(f"متن‌ها: {len(items)}، اندازه دسته: {args.batch}")
+
+    per_call = bench_subprocess(items, args.subprocess_calls)
+    subprocess_total = per_call * len(items)
+    print(f"{'پروسه جدا برای هر متن':<24} {subprocess_total:9.3f}s  ({per_call * 1000:.1f}ms برای هر متن، برون‌یابی)")
+
+    addresses = [("TCP localhost", f"127.0.0.1:{free_port()}")]
+    if hasattr(socket, 'AF_UNIX'):
+        addresses.append(("سوکت یونیکس", "unix:" + os.path.join(tempfile.mkdtemp(), "shaper.sock")))
+    for name, address in addresses:
+        cold, warm = bench_server(address, items, args.batch, expected)
+        print(f"{name + ' (کش سرد)':<24} {cold:9.3f}s  {len(items) / cold:9.0f} متن/ثانیه  {subprocess_total / cold:7.0f}x")
+        print(f"{name + ' (کش گرم)':<24} {warm:9.3f}s  {len(items) / warm:9.0f} متن/ثانیه  {subprocess_total / warm:7.0f}x")
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+اندازه‌گیری زمان راه‌اندازی مسیر بدون رابط گرافیک با python -X importtime.
+اگر ماژول‌های سنگین (pandas، arabic_reshaper، bidi و ...) هنگام import بارگذاری شوند
+یا زمان کل از --max-ms بیشتر شود، با کد خطا خارج می‌شود تا پسرفت‌ها دیده شوند.
+
+اجرا:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --module xml_processor --max-ms 150
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# ماژول‌هایی که نباید هنگام import مسیر خط فرمان بارگذاری شوند
+HEAVY_MODULES = ["pandas", "numpy", "openpyxl", "arabic_reshaper", "bidi", "multiprocessing"]
+
+
+def import_times(module):
+    # خروجی importtime: «import time: self [us] | cumulative | imported package»
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        fields = line[len("import time:"):].split("|")
+        try:
+            self_us, cumulative_us = int(fields[0]), int(fields[1])
+        except ValueError:
+            continue
+        times[fields[2].strip()] = (self_us, cumulative_us)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="No_Gui")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--max-ms", type=float, help="حداکثر زمان مجاز import (میلی‌ثانیه)")
+    args = parser.parse_args()
+
+    runs = [import_times(args.module) for _ in range(args.repeat)]
+    best = min(runs, key=lambda times: times[args.module][1])
+    total_ms = best[args.module][1] / 1000
+
+    print(f"import {args.module}: {total_ms:.1f}ms (بهترین از {args.repeat} اجرا)")
+    print("کندترین ماژول‌ها (زمان خود ماژول):")
+    for name, (self_us, cumulative_us) in sorted(best.items(), key=lambda item: -item[1][0])[:args.top]:
+        print(f"  {self_us / 1000:7.2f}ms  {cumulative_us / 1000:7.2f}ms  {name}")
+
+    failed = False
+    heavy = [name for name in HEAVY_MODULES if name in best]
+    if heavy:
+        print(f"خطا: ماژول‌های سنگین هنگام import بارگذاری شدند: {', '.join(heavy)}")
+        failed = True
+    if args.max_ms is not None and total_ms > args.max_ms:
+        print(f"خطا: زمان import بیشتر از {args.max_ms}ms است")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+مقایسه خط لوله تک‌گذره shape_text با زنجیره سه‌مرحله‌ای قبلی
+(add_linebreaks → reshape_arabic → rearrange_sentences) روی تمام مقادیر english_Original.xml.
+با --xlsx متن‌های ستون 1 یک فایل اکسل ترجمه‌شده هم به مجموعه اضافه می‌شوند.
+
+اجرا:
+    python benchmarks/bench_text_pipeline.py
+    python benchmarks/bench_text_pipeline.py --xlsx Book1.xlsx
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+import arabic_reshaper
+from bidi.algorithm import get_display
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from text_shaper import shape_text
+
+# چیدمان‌های ستون‌های 4,5,6 در Book1.xlsx؛ (0, 0) یعنی بدون شکستن خط
+LAYOUTS = [(0, 0), (35, 40), (26, 32), (40, 50), (22, 25)]
+
+
+def legacy_process_text(text, min_len, max_len, linebreaker):
+    # نسخه قبلی process_text برای مقایسه
+    if min_len > 0 and max_len > 0 and max_len > min_len:
+        processed_text = legacy_add_linebreaks(text, min_len, max_len, linebreaker)
+    else:
+        processed_text = text
+    processed_text = legacy_reshape_arabic(processed_text)
+    return legacy_rearrange_sentences(processed_text, linebreaker)
+
+
+def legacy_add_linebreaks(text, min_len, max_len, linebreaker):
+    arabic_regex = re.compile(r'[\u0600-\u08FF\uFB50-\uFEFF]')
+    output_lines = []
+    for line in text.splitlines():
+        if arabic_regex.search(line):
+            parts = []
+            while len(line) > max_len:
+                split_pos = line.rfind(' ', min_len, max_len)
+                if split_pos == -1:
+                    split_pos = max_len
+                parts.append(line[:split_pos])
+                line = line[split_pos:].lstrip()
+            parts.append(line)
+            line = linebreaker.join(parts)
+        output_lines.append(line)
+    return '\n'.join(output_lines)
+
+
+def legacy_reshape_arabic(text):
+    arabic_regex = re.compile(r'[\u0600-\u08FF\uFB50-\uFEFF]')
+    output_lines = []
+    for line in text.splitlines():
+        if arabic_regex.search(line):
+            line = get_display(arabic_reshaper.reshape(line))
+        output_lines.append(line)
+    return '\n'.join(output_lines)
+
+
+def legacy_rearrange_sentences(text, linebreaker):
+    arabic_regex = re.compile(r'[\u0600-\u08FF\uFB50-\uFEFF]')
+    output_lines = []
+    for line in text.splitlines():
+        if arabic_regex.search(line):
+            sentences = [s.strip() for s in line.split(linebreaker) if s.strip()]
+            sentences.reverse()
+            line = linebreaker.join(sentences)
+        output_lines.append(line)
+    return '\n'.join(output_lines)
+
+
+def load_corpus(xml_path, excel_path=None):
+    with open(xml_path, 'r', encoding='utf-8') as f:
+        values = re.findall(r'<item\s+key="[^"]+"\s+value="([^"]*)"\s*/>', f.read())
+    if excel_path:
+        import pandas as pd
+        column = pd.read_excel(excel_path, header=None)[1]
+        values.extend(str(text) for text in column.dropna().tolist())
+    return values
+
+
+def run(func, values, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = [func(text, min_len, max_len, "\n") for text in values for min_len, max_len in LAYOUTS]
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--xml", default=os.path.join(ROOT, "english_Original.xml"))
+    parser.add_argument("--xlsx", help="فایل اکسل ترجمه‌شده برای افزودن متن‌های فارسی")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    values = load_corpus(args.xml, args.xlsx)
+
+    legacy_time, legacy_results = run(legacy_process_text, values, args.repeat)
+    fused_time, fused_results = run(shape_text, values, args.repeat)
+
+    if legacy_results != fused_results:
+        print("خطا: خروجی shape_text با زنجیره قبلی یکسان نیست")
+        sys.exit(1)
+
+    calls = len(values) * len(LAYOUTS)
+    print(f"مقادیر:          {len(values)} × {len(LAYOUTS)} چیدمان = {calls} فراخوانی")
+    print(f"زنجیره قبلی:     {legacy_time:.3f}s ({legacy_time / calls * 1e6:.1f}µs/فراخوانی)")
+    print(f"تک‌گذره:         {fused_time:.3f}s ({fused_time / calls * 1e6:.1f}µs/فراخوانی)")
+    print(f"افزایش سرعت:     {legacy_time / fused_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
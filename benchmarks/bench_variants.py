@@ -0,0 +1,102 @@
+"""
+مقایسه ساخت چند نسخه ترجمه از یک XML مبدأ: N اجرای جدا (هر کدام با کش سرد و regex روی
+کل XML) در برابر build_variants (یک شاخص مشترک و شکل‌دهی مشترک متن‌های همه نسخه‌ها).
+نسخه‌ها از فایل اکسل --xlsx به صورت CSV ساخته می‌شوند، در دو حالت: متن‌های متفاوت (پسوند
+شماره نسخه روی هر متن، مثل فارسی و عربی) و متن‌های یکسان (مثل نسخه آزمایشی همان ترجمه).
+خروجی دو روش با هم مقایسه می‌شود و بهترین زمان از --repeat اجرا گزارش می‌شود. روی یک
+هسته سود build_variants کم است (حدود 1.1 تا 1.4 برابر با متن‌های یکسان و تقریباً هیچ با
+متن‌های متفاوت)؛ سود اصلی از --workers بیشتر از یک روی چند هسته به دست می‌آید.
+
+اجرا:
+    python benchmarks/bench_variants.py
+    python benchmarks/bench_variants.py --variants 5 --workers 0 --repeat 5 --xlsx Book1.xlsx
+"""
+import argparse
+import csv
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from text_shaper import ShapingEngine
+from translation_pipeline import TranslationPipeline, build_variants, process_text
+from xml_index import load_index
+
+
+def write_variants(excel_path, count, work_dir, distinct):
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(excel_path, read_only=True)
+    rows = list(workbook.active.iter_rows(values_only=True, max_col=7))
+    workbook.close()
+
+    paths = []
+    for variant in range(count):
+        path = os.path.join(work_dir, f"variant_{variant}_{distinct}.csv")
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            for row in rows:
+                row = list(row)
+                if isinstance(row[1], str) and variant and distinct:
+                    row[1] = f"{row[1]} {variant}"
+                writer.writerow(row)
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--xlsx", default=os.path.join(ROOT, "Book1.xlsx"))
+    parser.add_argument("--xml", default=os.path.join(ROOT, "english_Original.xml"))
+    parser.add_argument("--variants", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=1, help="تعداد پروسه‌های شکل‌دهی build_variants")
+    parser.add_argument("--repeat", type=int, default=3, help="تعداد تکرار هر روش (بهترین زمان گزارش می‌شود)")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp()
+    try:
+        # شاخص یک بار از قبل ساخته می‌شود تا فقط هزینه بارگذاری آن اندازه‌گیری شود
+        load_index(args.xml)
+        print(f"نسخه‌ها: {args.variants}")
+        for distinct, name in ((True, "متن‌های متفاوت"), (False, "متن‌های یکسان")):
+            separate_time, shared_time = bench(args, work_dir, distinct)
+            print(f"{name}:")
+            print(f"  {'اجرای جدا':<16} {separate_time:8.3f}s")
+            print(f"  {'build_variants':<16} {shared_time:8.3f}s  {separate_time / shared_time:5.2f}x")
+    finally:
+        shutil.rmtree(work_dir)
+
+
+def bench(args, work_dir, distinct):
+    workbooks = write_variants(args.xlsx, args.variants, work_dir, distinct)
+    separate = [os.path.join(work_dir, f"separate_{i}.xml") for i in range(args.variants)]
+    shared = [os.path.join(work_dir, f"shared_{i}.xml") for i in range(args.variants)]
+
+    separate_time = shared_time = None
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        for excel_path, output in zip(workbooks, separate):
+            TranslationPipeline(args.xml, output, engine=ShapingEngine(process_text)).run(excel_path)
+        elapsed = time.perf_counter() - start
+        separate_time = elapsed if separate_time is None else min(separate_time, elapsed)
+
+        start = time.perf_counter()
+        build_variants(args.xml, list(zip(workbooks, shared)), engine=ShapingEngine(process_text),
+                       workers=args.workers)
+        elapsed = time.perf_counter() - start
+        shared_time = elapsed if shared_time is None else min(shared_time, elapsed)
+
+    for first, second in zip(separate, shared):
+        with open(first, 'rb') as a, open(second, 'rb') as b:
+            if a.read() != b.read():
+                print(f"خطا: خروجی {second} با اجرای جدا یکسان نیست")
+                sys.exit(1)
+    return separate_time, shared_time
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+مقیاس‌پذیری شکل‌دهی موازی (shape_parallel) از 1 تا 8 پروسه روی متن‌های فارسی مصنوعی.
+
+اجرا:
+    python benchmarks/bench_workers.py
+    python benchmarks/bench_workers.py --texts 50000 --workers 1 2 4 8
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from shaping_pool import shape_parallel
+from xml_processor import process_text
+
+WORDS = (
+    "سرباز واحد موش خرگوش قورباغه سنجاب مزرعه آسیاب کارخانه لانه پرچم "
+    "فرمانده انقلاب گوشت نبرد دفاع حمله برج توپ شعله‌افکن «پیروزی» ؟ ! ، ۱۲۳"
+).split()
+
+LAYOUTS = [(0, 0), (35, 40), (26, 32), (40, 50), (22, 25)]
+
+
+def synthetic_jobs(count, seed=0):
+    rng = random.Random(seed)
+    jobs = []
+    for i in range(count):
+        words = rng.choice([2, 5, 12, 30, 60])
+        text = ' '.join(rng.choice(WORDS) for _ in range(words)) + f" {i}"
+        min_len, max_len = rng.choice(LAYOUTS)
+        jobs.append((text, min_len, max_len))
+    return jobs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--texts", type=int, default=20000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    jobs = synthetic_jobs(args.texts)
+    print(f"متن‌ها: {len(jobs)}، هسته‌های موجود: {os.cpu_count()}")
+
+    baseline = None
+    expected = None
+    for workers in args.workers:
+        start = time.perf_counter()
+        results = shape_parallel(process_text, jobs, workers)
+        elapsed = time.perf_counter() - start
+
+        if expected is None:
+            expected = results
+        elif results != expected:
+            print(f"خطا: خروجی با {workers} پروسه با اجرای سریالی یکسان نیست")
+            sys.exit(1)
+
+        baseline = baseline or elapsed
+        print(f"{workers:>2} پروسه: {elapsed:7.3f}s  افزایش سرعت {baseline / elapsed:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+مقایسه شکستن خط خطی (text_shaper.wrap_line) با حلقه قبلی add_linebreaks روی
+پاراگراف‌های بلند فارسی (متن‌های داستان و آموزش) با چیدمان‌های Book1.xlsx.
+خروجی هر دو روش برای همه طول‌ها و چیدمان‌ها مقایسه می‌شود.
+
+اجرا:
+    python benchmarks/bench_wrap.py
+    python benchmarks/bench_wrap.py --lengths 1000 10000 100000 --repeat 5
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from text_shaper import wrap_line
+
+WORDS = (
+    "سرباز واحد موش خرگوش قورباغه سنجاب مزرعه آسیاب کارخانه لانه پرچم "
+    "فرمانده انقلاب گوشت نبرد دفاع حمله برج توپ شعله‌افکن «پیروزی» ؟ ! ، ۱۲۳ "
+    "بلندترین‌واژه‌ای‌که‌هیچ‌فاصله‌ای‌ندارد"
+).split()
+
+LAYOUTS = [(35, 40), (26, 32), (40, 50), (22, 25)]
+
+
+def legacy_wrap_line(line, min_len, max_len):
+    # حلقه قبلی add_linebreaks: هر دور باقی‌مانده خط کپی و lstrip می‌شود
+    parts = []
+    while len(line) > max_len:
+        split_pos = line.rfind(' ', min_len, max_len)
+        if split_pos == -1:
+            split_pos = max_len
+        parts.append(line[:split_pos])
+        line = line[split_pos:].lstrip()
+    parts.append(line)
+    return parts
+
+
+def paragraph(length, seed=0):
+    rng = random.Random(seed)
+    words = []
+    size = 0
+    while size < length:
+        word = rng.choice(WORDS)
+        separator = rng.choice([' ', ' ', ' ', '  ', ' \t'])
+        words.append(word + separator)
+        size += len(word) + len(separator)
+    return ''.join(words)[:length]
+
+
+def timed(func, line, layouts, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for min_len, max_len in layouts:
+            func(line, min_len, max_len)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lengths", type=int, nargs="+", default=[200, 2000, 20000, 200000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for length in args.lengths:
+        line = paragraph(length, seed=length)
+        for min_len, max_len in LAYOUTS:
+            if wrap_line(line, min_len, max_len) != legacy_wrap_line(line, min_len, max_len):
+                print(f"خطا: خروجی برای طول {length} و چیدمان ({min_len}, {max_len}) یکسان نیست")
+                sys.exit(1)
+
+        legacy_time = timed(legacy_wrap_line, line, LAYOUTS, args.repeat)
+        new_time = timed(wrap_line, line, LAYOUTS, args.repeat)
+        print(f"{length:>7} کاراکتر: قبلی {legacy_time:8.4f}s  خطی {new_time:8.4f}s  "
+              f"افزایش سرعت {legacy_time / new_time:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
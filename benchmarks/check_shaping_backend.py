@@ -0,0 +1,154 @@
+"""
+بررسی تفاضلی مسیر سریع جدول‌محور (PersianTableBackend) در برابر مسیر کتابخانه‌ها
+(arabic_reshaper + python-bidi). هر خط عربی/فارسی english_Original.xml و فایل‌های اکسل
+(--xlsx، قابل تکرار؛ پیش‌فرض Book1.xlsx)، تکه‌های شکسته‌شده آن‌ها در هر چیدمان و چند هزار خط تصادفی با هر دو
+مسیر شکل داده می‌شوند (به همراه خطوطی که قبلاً اختلاف داشتند) و باید بایت به بایت یکسان باشند. جدول حروف هم با LETTERS_ARABIC و
+لیگاتورهای arabic_reshaper مقایسه می‌شود. در پایان پوشش مسیر سریع (سهم خطوطی که بدون
+کتابخانه‌ها شکل می‌گیرند) و افزایش سرعت گزارش می‌شود. در صورت هر اختلاف کد خروج 1 است.
+
+اجرا:
+    python benchmarks/check_shaping_backend.py
+    python benchmarks/check_shaping_backend.py --xlsx Book1.xlsx --xlsx fa.xlsx --random 20000 --seed 3
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from shaping_backends import LAM, LAM_ALEF, PERSIAN_LETTERS, LibraryBackend, table_display
+from text_shaper import arabic_regex, wrap_line
+
+# چیدمان‌های ستون‌های 4,5,6 در Book1.xlsx؛ (0, 0) یعنی بدون شکستن خط
+LAYOUTS = [(0, 0), (35, 40), (26, 32), (40, 50), (22, 25)]
+
+# الفبای خطوط تصادفی: حروف جدول، خنثی‌ها، ارقام و چند کاراکتر خارج از پوشش (اعراب، ZWJ، لاتین)؛
+# ZWNJ کنار ارقام و جداکننده‌ها پررنگ‌تر است چون bidi آن را نادیده می‌گیرد و عدد را به هم می‌چسباند
+RANDOM_ALPHABET = (list(PERSIAN_LETTERS) + [LAM] * 6 + ['\u0627'] * 6 + [' '] * 10
+                   + list('\u200C!"\'&*.:\u060C\u061F\u061B-\u00AB\u00BB()[]{}<>')
+                   + list('0123\u06F1\u06F2\u0661') + ['\u064E', '\u200D', 'a', '\u0640']
+                   + ['\u200C'] * 4 + ['1\u200C', '\u200C\u06F2', '\u200C:\u200C', '\u200C.', '-\u200C',
+                                      '\u200C\u060C\u200C'] * 2)
+
+# خطوطی که قبلاً در مسیر سریع با کتابخانه‌ها فرق داشتند
+REGRESSION_LINES = [
+    ':\u0628\u200C1\u200C:\u200C3)\u0662',
+    '\u00AB0\u200C:\u200C\u06F1\u061F\u0621',
+]
+
+
+def check_tables():
+    from arabic_reshaper.letters import LETTERS_ARABIC
+    from arabic_reshaper.ligatures import LETTERS_LIGATURES
+
+    errors = []
+    for letter, forms in PERSIAN_LETTERS.items():
+        if LETTERS_ARABIC.get(letter) != forms:
+            errors.append(f"شکل‌های {letter!r}: {forms!r} != {LETTERS_ARABIC.get(letter)!r}")
+    ligatures = {match: forms for _, (match, forms) in LETTERS_LIGATURES}
+    for alef, (isolated, final) in LAM_ALEF.items():
+        expected = ligatures.get(LAM + alef)
+        if expected is None or (expected[0], expected[3]) != (isolated, final):
+            errors.append(f"لیگاتور {LAM + alef!r}: {(isolated, final)!r} != {expected!r}")
+    return errors
+
+
+def load_lines(xml_path, excel_paths):
+    with open(xml_path, 'r', encoding='utf-8') as f:
+        texts = re.findall(r'<item\s+key="[^"]+"\s+value="([^"]*)"\s*/>', f.read())
+    for excel_path in excel_paths:
+        import pandas as pd
+        column = pd.read_excel(excel_path, header=None)[1]
+        texts.extend(str(text) for text in column.dropna().tolist())
+
+    lines = {}
+    for text in texts:
+        for line in text.splitlines():
+            if not arabic_regex.search(line):
+                continue
+            lines[line] = None
+            for min_len, max_len in LAYOUTS[1:]:
+                lines.update(dict.fromkeys(piece for piece in wrap_line(line, min_len, max_len)
+                                           if arabic_regex.search(piece)))
+    return list(lines)
+
+
+def random_lines(count, seed):
+    rng = random.Random(seed)
+    lines = list(REGRESSION_LINES)
+    while len(lines) < count:
+        line = ''.join(rng.choice(RANDOM_ALPHABET) for _ in range(rng.randint(1, 40)))
+        if arabic_regex.search(line):
+            lines.append(line)
+    return lines
+
+
+def compare(lines, library):
+    # تعداد خطوط مسیر سریع و لیست اختلاف‌ها
+    fast = 0
+    mismatches = []
+    for line in lines:
+        shaped = table_display(line)
+        if shaped is None:
+            continue
+        fast += 1
+        expected = library.display(line)
+        if shaped != expected:
+            mismatches.append((line, shaped, expected))
+    return fast, mismatches
+
+
+def timed(func, lines, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for line in lines:
+            func(line)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--xml", default=os.path.join(ROOT, "english_Original.xml"))
+    parser.add_argument("--xlsx", action="append",
+                        help="فایل اکسل ترجمه‌شده (قابل تکرار؛ پیش‌فرض Book1.xlsx همراه پروژه)")
+    parser.add_argument("--random", type=int, default=5000, help="تعداد خطوط تصادفی")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    errors = check_tables()
+    for error in errors:
+        print(f"خطای جدول: {error}")
+
+    library = LibraryBackend()
+    corpus = load_lines(args.xml, args.xlsx or [os.path.join(ROOT, "Book1.xlsx")])
+    failed = bool(errors)
+    for name, lines in (("متن‌ها", corpus), ("تصادفی", random_lines(args.random, args.seed))):
+        fast, mismatches = compare(lines, library)
+        coverage = fast / len(lines) * 100 if lines else 0.0
+        print(f"{name:<8} {len(lines):7} خط، مسیر سریع {fast:7} ({coverage:5.1f}%)، اختلاف {len(mismatches)}")
+        for line, shaped, expected in mismatches[:5]:
+            print(f"  {line!r}\n    جدول:     {shaped!r}\n    کتابخانه: {expected!r}")
+        failed = failed or bool(mismatches)
+
+    covered = [line for line in corpus if table_display(line) is not None]
+    if covered:
+        library_time = timed(library.display, covered, args.repeat)
+        table_time = timed(table_display, covered, args.repeat)
+        print(f"خطوط مسیر سریع متن‌ها: کتابخانه {library_time:.3f}s، جدول {table_time:.3f}s "
+              f"({library_time / table_time:.2f}x)")
+
+    if failed:
+        print("خطا: خروجی مسیر سریع با کتابخانه‌ها یکسان نیست")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
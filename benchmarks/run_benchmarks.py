@@ -0,0 +1,238 @@
+"""
+مجموعه بنچمارک قابل تکرار روی داده‌های همراه پروژه (Book1.xlsx و english_Original.xml)
+و نسخه‌های مصنوعی 10 و 100 برابری آن‌ها.
+
+برای هر مجموعه داده این موارد جداگانه اندازه‌گیری می‌شوند:
+    load            خواندن فایل اکسل بدون کش
+    load_cached     خواندن فایل اکسل از کش
+    add_linebreaks، reshape_arabic، rearrange_sentences، convert_special_chars
+                    هر مرحله متن روی تمام متن‌های ترجمه‌شده (ورودی هر مرحله خروجی مرحله قبل است)
+    rewrite         بازنویسی XML با جایگزینی بی‌اثر (regex + خواندن و نوشتن)
+    index_build     ساخت شاخص بایتی آیتم‌های XML
+    rewrite_indexed همان بازنویسی با شاخص (بدون regex، کپی بازه‌ای)
+    e2e             process_excel_to_xml کامل با کش شکل‌دهی خالی
+
+نتایج (کمینه و میانه زمان‌ها، نسخه git و مشخصات سیستم) در یک فایل JSON ذخیره می‌شوند
+و با --compare می‌توان آن‌ها را با اجرای یک commit دیگر مقایسه کرد.
+
+اجرا:
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --scales 1 10 --repeat 5 --output before.json
+    python benchmarks/run_benchmarks.py --compare before.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from excel_loader import read_excel_mappings
+from text_shaper import ShapingEngine
+from xml_processor import (add_linebreaks, convert_special_chars, process_excel_to_xml, process_text,
+                           rearrange_sentences, reshape_arabic)
+from xml_index import build_index, load_index
+from xml_rewriter import item_pattern, rewrite_xml
+
+BUNDLED_EXCEL = os.path.join(ROOT, "Book1.xlsx")
+BUNDLED_XML = os.path.join(ROOT, "english_Original.xml")
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+# واژه‌ها و چیدمان‌های ستون‌های 4,5,6 برای ساخت ترجمه‌های مصنوعی
+WORDS = (
+    "سرباز واحد موش خرگوش قورباغه سنجاب مزرعه آسیاب کارخانه لانه پرچم "
+    "فرمانده انقلاب گوشت نبرد دفاع حمله برج توپ شعله‌افکن «پیروزی» ؟ ! ، ۱۲۳ Tooth & Tail"
+).split()
+SETTINGS = [(1, 35, 40), (2, 26, 32), (3, 40, 50), (4, 22, 25)]
+
+
+def synthetic_corpus(directory, scale, seed=0):
+    """
+    ساخت یک XML و فایل اکسل scale برابری از روی english_Original.xml.
+    هر آیتم در هر تکرار کلید جدا و ترجمه فارسی تقریباً هم‌طول مقدار انگلیسی می‌گیرد.
+    """
+    from openpyxl import Workbook
+
+    rng = random.Random(seed)
+    with open(BUNDLED_XML, 'r', encoding='utf-8') as f:
+        source = f.read()
+    matches = list(item_pattern.finditer(source))
+    head = source[:matches[0].start()]
+    tail = source[matches[-1].end():]
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(["key", "value", None, "ID", "ID", "min", "max"])
+    items = []
+    for copy in range(scale):
+        for index, match in enumerate(matches):
+            key = f"{match.group(1)}__{copy}"
+            items.append(f'<item key="{key}" value="{match.group(2)}" />')
+            target = max(len(match.group(2)), 1)
+            words = []
+            while sum(len(w) + 1 for w in words) < target:
+                words.append(rng.choice(WORDS))
+            settings = SETTINGS[index] if copy == 0 and index < len(SETTINGS) else (None, None, None)
+            sheet.append([key, ' '.join(words), None, rng.choice([0, 1, 2, 3, 4]), *settings])
+
+    excel_path = os.path.join(directory, f"synthetic_x{scale}.xlsx")
+    xml_path = os.path.join(directory, f"synthetic_x{scale}.xml")
+    workbook.save(excel_path)
+    with open(xml_path, 'w', encoding='utf-8') as f:
+        f.write(head + "\n    ".join(items) + tail)
+    return excel_path, xml_path
+
+
+def stage_inputs(excel_path, xml_path):
+    # (text, min_len, max_len) همان‌طور که process_excel_to_xml برای هر آیتم تعیین می‌کند
+    id_settings, valid_ids, key_to_id, key_to_text = read_excel_mappings(excel_path, use_cache=False)
+    with open(xml_path, 'r', encoding='utf-8') as f:
+        xml_content = f.read()
+
+    inputs = []
+    for match in item_pattern.finditer(xml_content):
+        key = match.group(1)
+        if key not in key_to_id:
+            continue
+        id_val = key_to_id[key]
+        if id_val == 0:
+            min_len, max_len = 0, 0
+        elif id_val in valid_ids:
+            min_len, max_len = id_settings[id_val]['min_len'], id_settings[id_val]['max_len']
+        else:
+            continue
+        text = key_to_text.get(key, match.group(2))
+        if isinstance(text, str):
+            inputs.append((text, min_len, max_len))
+    return inputs
+
+
+def measure(func, repeat, setup=None):
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return {'min': min(times), 'median': statistics.median(times), 'repeat': repeat}
+
+
+def bench_dataset(name, excel_path, xml_path, repeat, workdir):
+    results = {}
+    output_path = os.path.join(workdir, f"{name}_out.xml")
+    cache_dir = os.path.join(workdir, "cache")
+
+    def run(case, func, setup=None):
+        results[case] = measure(func, repeat, setup)
+        print(f"  {case:<22} min {results[case]['min']:8.4f}s  median {results[case]['median']:8.4f}s")
+
+    run('load', lambda: read_excel_mappings(excel_path, use_cache=False))
+    read_excel_mappings(excel_path, cache_dir=cache_dir)
+    run('load_cached', lambda: read_excel_mappings(excel_path, cache_dir=cache_dir))
+
+    inputs = stage_inputs(excel_path, xml_path)
+    wrapped = [(add_linebreaks(text, min_len, max_len, "\n") if min_len > 0 and max_len > min_len else text)
+               for text, min_len, max_len in inputs]
+    reshaped = [reshape_arabic(text) for text in wrapped]
+    rearranged = [rearrange_sentences(text, "\n") for text in reshaped]
+
+    run('add_linebreaks', lambda: [add_linebreaks(text, min_len, max_len, "\n")
+                                   for text, min_len, max_len in inputs if min_len > 0 and max_len > min_len])
+    run('reshape_arabic', lambda: [reshape_arabic(text) for text in wrapped])
+    run('rearrange_sentences', lambda: [rearrange_sentences(text, "\n") for text in reshaped])
+    run('convert_special_chars', lambda: [convert_special_chars(text) for text in rearranged])
+    run('rewrite', lambda: rewrite_xml(xml_path, output_path, lambda match: match.group(0)))
+    run('index_build', lambda: build_index(xml_path))
+    index = load_index(xml_path)
+    run('rewrite_indexed', lambda: rewrite_xml(xml_path, output_path, lambda match: match.group(0), index=index))
+
+    # هر تکرار با کش شکل‌دهی خالی اجرا می‌شود تا زمان واقعی یک اجرای تازه اندازه‌گیری شود
+    def e2e():
+        success, message = process_excel_to_xml(excel_path, xml_path, output_path,
+                                                engine=ShapingEngine(process_text))
+        if not success:
+            raise RuntimeError(message)
+    run('e2e', e2e)
+
+    with open(xml_path, 'r', encoding='utf-8') as f:
+        item_count = sum(1 for _ in item_pattern.finditer(f.read()))
+    return {'items': item_count, 'translated': len(inputs), 'cases': results}
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(previous, current):
+    print(f"\nمقایسه با {previous.get('revision')} ({previous.get('date')}):")
+    for dataset, data in current['datasets'].items():
+        old = previous.get('datasets', {}).get(dataset)
+        if old is None:
+            continue
+        print(f"  {dataset}")
+        for case, timing in data['cases'].items():
+            old_timing = old['cases'].get(case)
+            if old_timing is None:
+                continue
+            ratio = old_timing['min'] / timing['min'] if timing['min'] else float('inf')
+            print(f"    {case:<22} {old_timing['min']:8.4f}s → {timing['min']:8.4f}s  {ratio:5.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100],
+                        help="1 یعنی داده‌های همراه پروژه؛ بقیه نسخه مصنوعی چند برابری")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="مسیر فایل JSON نتایج (پیش‌فرض benchmarks/results/<زمان>-<commit>.json)")
+    parser.add_argument("--compare", metavar="JSON", help="فایل نتایج یک اجرای قبلی برای مقایسه")
+    args = parser.parse_args()
+
+    revision = git_revision()
+    current = {
+        'revision': revision,
+        'date': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'repeat': args.repeat,
+        'datasets': {},
+    }
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for scale in args.scales:
+            if scale == 1:
+                name, excel_path, xml_path = "bundled", BUNDLED_EXCEL, BUNDLED_XML
+            else:
+                name = f"x{scale}"
+                print(f"ساخت داده مصنوعی {name} ...")
+                excel_path, xml_path = synthetic_corpus(workdir, scale)
+            print(f"{name}:")
+            current['datasets'][name] = bench_dataset(name, excel_path, xml_path, args.repeat, workdir)
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{revision or 'unknown'}.json")
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(current, f, ensure_ascii=False, indent=2)
+    print(f"\nنتایج در {output} ذخیره شد")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            compare(json.load(f), current)
+
+
+if __name__ == "__main__":
+    main()
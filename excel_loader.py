@@ -0,0 +1,335 @@
+import csv
+import hashlib
+import json
+import os
+
+from atomic_output import save_json
+from xml_rewriter import ProcessingCancelled
+
+# نسخه قالب فایل کش؛ با تغییر ساختار داده‌ها باید افزایش یابد
+CACHE_VERSION = 4
+CACHE_SUFFIX = ".cache"
+
+# هر چند ردیف یک بار پیشرفت خواندن گزارش و لغو بررسی می‌شود
+LOAD_PROGRESS_INTERVAL = 500
+
+# خروجی‌های متنی همان جدول؛ بدون pandas و بدون کش خوانده می‌شوند
+DELIMITERS = {'.csv': ',', '.tsv': '\t'}
+
+# رشته‌هایی که pd.read_excel به صورت پیش‌فرض NaN می‌خواند، به‌علاوه خطاهای فرمول اکسل
+MISSING_VALUES = frozenset([
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null',
+    '#DIV/0!', '#NAME?', '#NULL!', '#NUM!', '#REF!', '#VALUE!',
+])
+
+# انواعی که JSON همان‌طور برمی‌گرداند (tuple و ... لیست می‌شوند)
+_JSON_TYPES = (str, int, float, bool)
+
+# پسوند فایل → (بارگذار، استفاده از کش)؛ با register_loader قابل گسترش است
+LOADERS = {}
+
+
+def load_excel_mappings(excel_data):
+    """
+    استخراج تنظیمات طول، نگاشت کلید به ID و کلید به متن از DataFrame اکسل
+    با عملیات ستونی (بدون iterrows). قواعد مانند حلقه قبلی No_Gui است: ردیف تنظیمات
+    نامعتبر (ستون‌های 4 تا 6) فقط از id_settings کنار گذاشته می‌شود و کلید و متن همان
+    ردیف باقی می‌مانند؛ برای کلید تکراری آخرین ردیف برنده است. (حلقه قبلی رابط گرافیکی
+    در این حالت کل ردیف را رد می‌کرد؛ هر دو نسخه حالا قاعده No_Gui را دارند.)
+    """
+    id_settings = {}
+    key_to_id = {}
+    key_to_text = {}
+    columns = excel_data.shape[1]
+
+    # تنظیمات طول از ستون‌های 4,5,6
+    if columns > 6:
+        settings = excel_data[[4, 5, 6]].dropna()
+        for id_val, min_len, max_len in _settings_rows(settings):
+            id_settings[id_val] = {
+                'min_len': min_len,
+                'max_len': max_len
+            }
+
+    # نگاشت کلید به ID از ستون‌های 0 و 3
+    if columns > 3:
+        mask = excel_data[0].notna() & excel_data[3].notna()
+        key_to_id = dict(zip(excel_data[0][mask].tolist(), excel_data[3][mask].tolist()))
+
+    # متن‌ها از ستون‌های 0 و 1
+    if columns > 1:
+        mask = excel_data[0].notna() & excel_data[1].notna()
+        key_to_text = dict(zip(excel_data[0][mask].tolist(), excel_data[1][mask].tolist()))
+
+    valid_ids = set(id_settings)
+    return id_settings, valid_ids, key_to_id, key_to_text
+
+
+def read_excel_mappings(excel_path, cache_dir=None, use_cache=True, refresh_cache=False, progress=None,
+                        cancel=None):
+    """
+    خواندن نگاشت‌ها از فایل جدول ترجمه با کش دائمی روی دیسک.
+    بارگذار بر اساس پسوند فایل از LOADERS انتخاب می‌شود (xlsx جریانی با openpyxl،
+    csv/tsv با ماژول csv، ods و بقیه با pandas).
+    کش بر اساس مسیر، اندازه، زمان تغییر و هش محتوای فایل اعتبارسنجی می‌شود و
+    در صورت معتبر بودن، خود فایل اصلاً خوانده نمی‌شود.
+    refresh_cache=True کش را نادیده گرفته و بارگذاری کامل انجام می‌دهد.
+    progress(done, total) تعداد ردیف‌های خوانده‌شده را گزارش می‌کند (total صفر یعنی نامعلوم)
+    و اگر cancel() مقدار True برگرداند ProcessingCancelled رخ می‌دهد.
+    """
+    loader, cacheable = get_loader(excel_path)
+    if not use_cache or not cacheable:
+        return loader(excel_path, progress=progress, cancel=cancel)
+
+    cache_path = excel_cache_path(excel_path, cache_dir)
+    cache_key = _cache_key(excel_path)
+
+    if not refresh_cache:
+        cached = _read_cache(cache_path, cache_key)
+        if cached is not None:
+            id_settings, key_to_id, key_to_text, rows = cached
+            if progress is not None:
+                progress(rows, rows)
+            return id_settings, set(id_settings), key_to_id, key_to_text
+
+    # تعداد ردیف‌ها هم در کش ذخیره می‌شود تا بارگذاری از کش همان پیشرفت را گزارش کند
+    rows_read = [0]
+
+    def track(done, total):
+        rows_read[0] = done
+        if progress is not None:
+            progress(done, total)
+
+    id_settings, valid_ids, key_to_id, key_to_text = loader(excel_path, progress=track, cancel=cancel)
+    _write_cache(cache_path, cache_key, (id_settings, key_to_id, key_to_text), rows_read[0])
+    return id_settings, valid_ids, key_to_id, key_to_text
+
+
+def register_loader(extensions, loader, cached=True):
+    """
+    ثبت بارگذار برای یک یا چند پسوند فایل.
+    loader(path, progress=None, cancel=None) باید (id_settings, valid_ids, key_to_id, key_to_text)
+    برگرداند و پیشرفت و لغو را مثل read_excel_mappings پشتیبانی کند (حداقل یک progress پایانی
+    با تعداد کل ردیف‌ها)؛ cached=False برای قالب‌هایی که خواندنشان از کش ارزان‌تر است.
+    """
+    if isinstance(extensions, str):
+        extensions = [extensions]
+    for extension in extensions:
+        LOADERS[extension.lower()] = (loader, cached)
+
+
+def get_loader(path):
+    # پسوند ناشناخته (مثلاً xls) به pd.read_excel سپرده می‌شود
+    extension = os.path.splitext(path)[1].lower()
+    return LOADERS.get(extension, (read_pandas_mappings, True))
+
+
+def mappings_from_rows(rows, progress=None, cancel=None, total=0):
+    """
+    ساخت نگاشت‌ها از سطرهای جدول (tuple مقادیر خانه‌ها، None برای خانه خالی).
+    قواعد همان load_excel_mappings است (تنظیمات نامعتبر نگاشت کلید ردیف را حذف نمی‌کند)؛
+    رشته‌هایی که pd.read_excel آن‌ها را NaN می‌خواند خالی حساب می‌شوند و عدد اعشاری
+    صحیح مثل pandas به int تبدیل می‌شود. هر LOAD_PROGRESS_INTERVAL ردیف progress(done, total)
+    صدا زده و cancel بررسی می‌شود.
+    """
+    id_settings = {}
+    key_to_id = {}
+    key_to_text = {}
+    padding = (None,) * 7
+    track = progress is not None or cancel is not None
+    done = 0
+
+    for row in rows:
+        done += 1
+        if track and done % LOAD_PROGRESS_INTERVAL == 0:
+            _load_progress(done, total, progress, cancel)
+        if len(row) < 7:
+            row = tuple(row) + padding[len(row):]
+        key, text, _, id_val, settings_id, min_len, max_len = (_cell(value) for value in row[:7])
+
+        # تنظیمات طول از ستون‌های 4,5,6
+        if settings_id is not None and min_len is not None and max_len is not None:
+            try:
+                id_settings[int(settings_id)] = {
+                    'min_len': int(min_len),
+                    'max_len': int(max_len)
+                }
+            except (ValueError, TypeError, OverflowError):
+                pass
+
+        # نگاشت کلید به ID و متن
+        if key is not None:
+            if id_val is not None:
+                key_to_id[key] = id_val
+            if text is not None:
+                key_to_text[key] = text
+
+    if progress is not None:
+        progress(done, done)
+    return id_settings, set(id_settings), key_to_id, key_to_text
+
+
+def _load_progress(done, total, progress, cancel):
+    if cancel is not None and cancel():
+        raise ProcessingCancelled()
+    if progress is not None:
+        progress(done, total)
+
+
+def _cell(value):
+    if value is None:
+        return None
+    if value.__class__ is str:
+        return None if value in MISSING_VALUES else value
+    if value.__class__ is float:
+        if value != value:
+            return None
+        if value.is_integer():
+            return int(value)
+    return value
+
+
+def read_xlsx_mappings(path, progress=None, cancel=None):
+    """
+    خواندن جریانی xlsx با openpyxl در حالت read-only: فقط هفت ستون اول و فقط مقادیر
+    خوانده می‌شوند و بدون ساختن DataFrame مستقیماً به نگاشت‌ها تبدیل می‌شوند.
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[0]
+        # max_row از ابعاد ذخیره‌شده در فایل می‌آید و ممکن است نباشد
+        return mappings_from_rows(sheet.iter_rows(max_col=7, values_only=True), progress, cancel,
+                                  sheet.max_row or 0)
+    finally:
+        workbook.close()
+
+
+def read_delimited_mappings(path, delimiter, progress=None, cancel=None):
+    """
+    خواندن نگاشت‌ها از خروجی CSV/TSV جدول با ماژول csv.
+    ستون‌های ID و طول مثل اکسل به عدد تبدیل می‌شوند.
+    """
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        return mappings_from_rows((
+            row[:3] + [_parse_number(cell) for cell in row[3:7]]
+            for row in csv.reader(f, delimiter=delimiter)
+        ), progress, cancel)
+
+
+def read_pandas_mappings(path, engine=None, progress=None, cancel=None):
+    # مسیر عمومی pd.read_excel (ods با engine='odf'، xls و ...)؛ خواندن یکجاست و پیشرفت و
+    # لغو فقط بعد از آن بررسی می‌شوند
+    import pandas as pd
+
+    excel_data = pd.read_excel(path, header=None, engine=engine)
+    _load_progress(len(excel_data), len(excel_data), progress, cancel)
+    return load_excel_mappings(excel_data)
+
+
+def _parse_number(cell):
+    try:
+        return int(cell)
+    except ValueError:
+        pass
+    try:
+        return float(cell)
+    except ValueError:
+        return cell
+
+
+def excel_cache_path(excel_path, cache_dir=None):
+    # پیش‌فرض: کنار فایل اکسل؛ در پوشه کش، هش مسیر از تداخل نام‌ها جلوگیری می‌کند
+    excel_path = os.path.abspath(excel_path)
+    if cache_dir is None:
+        return excel_path + CACHE_SUFFIX
+    path_hash = hashlib.sha1(excel_path.encode('utf-8')).hexdigest()[:12]
+    return os.path.join(cache_dir, f"{os.path.basename(excel_path)}-{path_hash}{CACHE_SUFFIX}")
+
+
+def _cache_key(excel_path):
+    stat = os.stat(excel_path)
+    digest = hashlib.sha256()
+    with open(excel_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return (CACHE_VERSION, os.path.abspath(excel_path), stat.st_size, stat.st_mtime_ns, digest.hexdigest())
+
+
+def _read_cache(cache_path, cache_key):
+    # کش JSON است و نه pickle: فایل .cache کنار اکسل ممکن است همراه پوشه از جای دیگری آمده
+    # باشد و خواندن آن نباید بتواند کدی اجرا کند. هر خطایی (فایل ناقص، نسخه قدیمی، کلید
+    # متفاوت) یعنی کش نامعتبر است
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            stored = json.load(f)
+        if stored['key'] != list(cache_key):
+            return None
+        id_settings = {
+            id_val: {'min_len': min_len, 'max_len': max_len}
+            for id_val, min_len, max_len in stored['id_settings']
+        }
+        return id_settings, dict(stored['key_to_id']), dict(stored['key_to_text']), stored['rows']
+    except Exception:
+        return None
+
+
+def _write_cache(cache_path, cache_key, mappings, rows):
+    id_settings, key_to_id, key_to_text = mappings
+    # مقادیری که JSON بدون تغییر نوع برنمی‌گرداند (مثلاً تاریخ) کش نمی‌شوند
+    if not (_json_values(key_to_id) and _json_values(key_to_text)):
+        return
+    stored = {
+        'key': cache_key,
+        'id_settings': [[id_val, s['min_len'], s['max_len']] for id_val, s in id_settings.items()],
+        'key_to_id': list(key_to_id.items()),
+        'key_to_text': list(key_to_text.items()),
+        'rows': rows,
+    }
+
+    # نوشتن اتمیک تا کش نیمه‌کاره هیچ‌وقت خوانده نشود؛ پوشه فقط‌خواندنی پردازش را متوقف نمی‌کند
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    except OSError:
+        return
+    save_json(cache_path, stored)
+
+
+def _json_values(mapping):
+    for key, value in mapping.items():
+        if key.__class__ not in _JSON_TYPES or value.__class__ not in _JSON_TYPES:
+            return False
+    return True
+
+
+def _settings_rows(settings):
+    import pandas as pd
+
+    # مسیر سریع: ستون‌های عددی و متناهی مستقیماً به int تبدیل می‌شوند
+    values = settings.to_numpy()
+    if (
+        all(pd.api.types.is_numeric_dtype(dtype) for dtype in settings.dtypes)
+        and values.size
+        and pd.api.types.is_numeric_dtype(values.dtype)
+        and abs(values).max() < 2 ** 63
+    ):
+        return zip(*(settings[col].astype('int64').tolist() for col in settings.columns))
+
+    # مسیر کند: مقادیر غیرعددی مثل int() قبلی تک‌تک بررسی می‌شوند
+    rows = []
+    for id_val, min_len, max_len in zip(*(settings[col].tolist() for col in settings.columns)):
+        try:
+            rows.append((int(id_val), int(min_len), int(max_len)))
+        except:
+            continue
+    return rows
+
+
+register_loader(['.xlsx', '.xlsm'], read_xlsx_mappings)
+register_loader('.ods', lambda path, **kwargs: read_pandas_mappings(path, engine='odf', **kwargs))
+for _extension, _delimiter in DELIMITERS.items():
+    register_loader(_extension,
+                    lambda path, delimiter=_delimiter, **kwargs: read_delimited_mappings(path, delimiter, **kwargs),
+                    cached=False)
@@ -0,0 +1,71 @@
+import os
+import time
+
+# فاصله بررسی فایل‌ها (ثانیه)
+POLL_INTERVAL = 0.25
+
+# مدتی که فایل‌ها باید بدون تغییر بمانند تا تغییر گزارش شود (ثانیه)
+DEBOUNCE_DELAY = 0.5
+
+
+def file_signature(path):
+    # امضای فایل: زمان تغییر و اندازه؛ None اگر فایل (مثلاً در میانه ذخیره) وجود نداشته باشد
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class FileWatcher:
+    """
+    نظارت بر تغییر فایل‌ها با polling، بدون سرویس یا کتابخانه خارجی.
+    تغییرها فقط وقتی گزارش می‌شوند که همه فایل‌های تغییرکرده به مدت debounce ثانیه
+    ثابت مانده باشند؛ این‌طور چند ذخیره پشت سر هم اکسل (یا فایل موقت و rename آن)
+    فقط یک بار پردازش می‌شوند.
+    """
+
+    def __init__(self, paths, interval=POLL_INTERVAL, debounce=DEBOUNCE_DELAY):
+        self.paths = list(dict.fromkeys(os.path.abspath(path) for path in paths))
+        self.interval = interval
+        self.debounce = debounce
+        self._signatures = {path: file_signature(path) for path in self.paths}
+        self._pending = {}
+        self._last_change = 0.0
+
+    def poll(self):
+        # یک بار بررسی؛ لیست مسیرهای تغییرکرده (مطلق) یا لیست خالی
+        now = time.monotonic()
+        for path in self.paths:
+            signature = file_signature(path)
+            if signature != self._pending.get(path, self._signatures[path]):
+                self._pending[path] = signature
+                self._last_change = now
+
+        if not self._pending or now - self._last_change < self.debounce:
+            return []
+        # فایلی که هنوز در حال جایگزینی است آماده خواندن نیست
+        if any(signature is None for signature in self._pending.values()):
+            return []
+
+        changed = [path for path, signature in self._pending.items() if signature != self._signatures[path]]
+        self._signatures.update(self._pending)
+        self._pending.clear()
+        return changed
+
+    def wait(self, stop=None):
+        # انتظار تا تغییر بعدی؛ اگر stop() مقدار True برگرداند لیست خالی برمی‌گردد
+        while True:
+            changed = self.poll()
+            if changed:
+                return changed
+            if stop is not None and stop():
+                return []
+            time.sleep(self.interval)
+
+    def reset(self, paths=None):
+        # ثبت وضعیت فعلی فایل‌ها بدون گزارش تغییر (مثلاً بعد از نوشتن خروجی‌ای که خودش نظارت می‌شود)
+        for path in self.paths if paths is None else (os.path.abspath(path) for path in paths):
+            if path in self._signatures:
+                self._signatures[path] = file_signature(path)
+                self._pending.pop(path, None)
@@ -1,9 +1,10 @@
 import sys
 import os
+import threading
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
                              QLabel, QLineEdit, QPushButton, QFileDialog, QTextEdit, 
-                             QGroupBox, QMessageBox, QTabWidget, QProgressBar, QFrame)
-from PyQt5.QtCore import Qt, QSettings
+                             QGroupBox, QMessageBox, QTabWidget, QProgressBar, QFrame, QCheckBox)
+from PyQt5.QtCore import Qt, QSettings, QThread, pyqtSignal
 from PyQt5.QtGui import QFont, QPalette, QColor, QIcon
 
 class ModernFileInput(QWidget):
@@ -78,10 +79,81 @@ class ModernFileInput(QWidget):
     def set_path(self, path):
         self.line_edit.setText(path)
 
+class ProcessingWorker(QThread):
+    # مرحله ('load' یا 'items')، تعداد انجام‌شده، تعداد کل
+    progress = pyqtSignal(str, int, int)
+    # نتیجه هر اجرا در حالت نظارت (موفقیت و پیام)
+    rebuilt = pyqtSignal(bool, str)
+    # موفقیت و پیام نتیجه
+    result = pyqtSignal(bool, str)
+    
+    def __init__(self, excel_path, xml_path, output_path, watch=False, save_validation=False):
+        super().__init__()
+        self.excel_path = excel_path
+        self.xml_path = xml_path
+        self.output_path = output_path
+        self.watch = watch
+        self.save_validation = save_validation
+        self.cancel_event = threading.Event()
+    
+    def run(self):
+        try:
+            success, message = self.process()
+            if self.watch and not self.cancel_event.is_set():
+                success, message = self.watch_files(success, message)
+        except Exception as e:
+            success, message = False, f"خطا در پردازش:\n{str(e)}"
+        self.result.emit(success, message)
+    
+    def process(self):
+        from run_report import RunReport
+        from validation import ValidationReport
+        from xml_processor import process_excel_to_xml
+        
+        # گزارش زمان مراحل و کندترین کلیدها زیر پیام نتیجه در پیش‌نمایش نمایش داده می‌شود
+        report = RunReport()
+        # خلاصه کنترل کیفیت همیشه نمایش داده می‌شود؛ فایل CSV آن فقط با انتخاب کاربر کنار
+        # خروجی ذخیره می‌شود (خروجی معمولاً english.xml داخل پوشه بازی است)
+        validation = ValidationReport()
+        success, message = process_excel_to_xml(
+            self.excel_path, self.xml_path, self.output_path, incremental=self.watch,
+            progress=self.progress.emit, cancel=self.cancel_event.is_set, report=report,
+            validation=validation
+        )
+        if success:
+            message = f"{message}\n\n{validation.summary()}"
+            if self.save_validation:
+                validation_path = self.output_path + ".validation.csv"
+                try:
+                    validation.write(validation_path)
+                    message += f"\nجزئیات در {validation_path}"
+                except OSError as e:
+                    # خروجی اصلی نوشته شده است؛ خطای ذخیره گزارش نتیجه را ناموفق نمی‌کند
+                    message += f"\nذخیره گزارش کنترل کیفیت ممکن نشد: {e}"
+            message = f"{message}\n\n{report.format_text()}"
+        return success, message
+    
+    def watch_files(self, success, message):
+        # حالت نظارت: با هر ذخیره اکسل یا XML ورودی فقط کلیدهای تغییرکرده دوباره ساخته می‌شوند؛
+        # کش شکل‌دهی بین اجراها گرم می‌ماند و دکمه لغو نظارت را متوقف می‌کند
+        from file_watcher import FileWatcher
+        
+        watcher = FileWatcher([self.excel_path, self.xml_path])
+        while True:
+            self.rebuilt.emit(success, message)
+            if not watcher.wait(stop=self.cancel_event.is_set):
+                return success, f"{message}\n\nنظارت متوقف شد"
+            success, message = self.process()
+            watcher.reset([self.output_path])
+    
+    def cancel(self):
+        self.cancel_event.set()
+
 class XmlProcessorGUI(QMainWindow):
     def __init__(self):
         super().__init__()
         self.settings = QSettings("XML_Processor", "پردازشگر_XML")
+        self.worker = None
         self.setup_ui()
         self.load_settings()
         
@@ -218,6 +290,45 @@ class XmlProcessorGUI(QMainWindow):
         """)
         self.process_btn.clicked.connect(self.process_files)
         
+        # دکمه لغو پردازش
+        self.cancel_btn = QPushButton("لغو")
+        self.cancel_btn.setStyleSheet("""
+            QPushButton {
+                padding: 12px;
+                background: #a54a4a;
+                color: white;
+                border: none;
+                border-radius: 4px;
+                font-weight: bold;
+                font-family: Arial;
+                font-size: 14pt;
+            }
+            QPushButton:hover {
+                background: #8f3a3a;
+            }
+            QPushButton:disabled {
+                background: #ccc;
+            }
+        """)
+        self.cancel_btn.setEnabled(False)
+        self.cancel_btn.clicked.connect(self.cancel_processing)
+        
+        # نظارت بر تغییر فایل اکسل و XML ورودی بعد از پردازش اول
+        self.watch_check = QCheckBox("نظارت بر تغییرات")
+        self.watch_check.setToolTip("بعد از هر ذخیره فایل اکسل یا XML ورودی، خروجی دوباره ساخته می‌شود")
+        self.watch_check.setStyleSheet("font-family: Arial; font-size: 12pt;")
+        
+        # ذخیره فایل گزارش کنترل کیفیت کنار خروجی (خلاصه آن همیشه در نتایج نمایش داده می‌شود)
+        self.validation_check = QCheckBox("ذخیره گزارش کنترل کیفیت")
+        self.validation_check.setToolTip("فهرست خطوط بلند، شکستن اجباری و کلیدهای غایب در فایل CSV کنار خروجی ذخیره می‌شود")
+        self.validation_check.setStyleSheet("font-family: Arial; font-size: 12pt;")
+        
+        buttons_layout = QHBoxLayout()
+        buttons_layout.addWidget(self.process_btn, 1)
+        buttons_layout.addWidget(self.watch_check)
+        buttons_layout.addWidget(self.validation_check)
+        buttons_layout.addWidget(self.cancel_btn)
+        
         # بخش پیش‌نمایش
         self.preview_label = QLabel("نتایج:")
         self.preview_label.setStyleSheet("font-family: Arial; font-size: 12pt;")
@@ -236,7 +347,7 @@ class XmlProcessorGUI(QMainWindow):
         
         # افزودن به لیآوت اصلی
         layout.addWidget(input_group)
-        layout.addWidget(self.process_btn)
+        layout.addLayout(buttons_layout)
         layout.addWidget(self.preview_label)
         layout.addWidget(self.preview_text, 1)
     
@@ -264,6 +375,7 @@ class XmlProcessorGUI(QMainWindow):
                 <li>تبدیل کاراکترهای خاص جایگزینی خودکار  & ، &lt; ، &gt; ، "و'  با معادل .</li>
                 <li>تنظیم طول خط کنترل خودکار طول خطوط متن بر اساس حداقل و حداکثر تعیین‌شده.</li>
                 <li>ذخیره تنظیمات به خاطر سپردن آخرین فایل‌های استفاده‌شده برای استفاده بعدی.</li>
+                <li>کنترل کیفیت خلاصه خطوط بلند و شکستن‌های اجباری در نتایج؛ با «ذخیره گزارش کنترل کیفیت» فهرست کامل در فایل CSV کنار خروجی ذخیره می‌شود.</li>
             </ul>
             
             <h2>پشتیبانی:</h2>
@@ -287,11 +399,13 @@ class XmlProcessorGUI(QMainWindow):
         self.excel_input.set_path(self.settings.value("excel_path", ""))
         self.xml_input.set_path(self.settings.value("xml_path", ""))
         self.output_input.set_path(self.settings.value("output_path", ""))
+        self.validation_check.setChecked(self.settings.value("save_validation", False, type=bool))
     
     def save_settings(self):
         self.settings.setValue("excel_path", self.excel_input.get_path())
         self.settings.setValue("xml_path", self.xml_input.get_path())
         self.settings.setValue("output_path", self.output_input.get_path())
+        self.settings.setValue("save_validation", self.validation_check.isChecked())
     
     def validate_inputs(self):
         if not os.path.isfile(self.excel_input.get_path()):
@@ -324,33 +438,64 @@ class XmlProcessorGUI(QMainWindow):
         if reply == QMessageBox.No:
             return
             
-        try:
-            self.progress_bar.setVisible(True)
-            self.progress_bar.setValue(0)
-            
-            # شبیه‌سازی پیشرفت پردازش
-            for i in range(1, 101):
-                self.progress_bar.setValue(i)
-                QApplication.processEvents()
-            
-            # پردازش اصلی
-            from xml_processor import process_excel_to_xml
-            
-            excel_path = self.excel_input.get_path()
-            xml_path = self.xml_input.get_path()
-            output_path = self.output_input.get_path()
-            
-            success, message = process_excel_to_xml(excel_path, xml_path, output_path)
-            
-            # نمایش نتیجه در بخش پیش‌نمایش
-            self.preview_text.setPlainText(message)
-            self.save_settings()
-            
-        except Exception as e:
-            self.preview_text.setPlainText(f"خطا در پردازش:\n{str(e)}")
-        finally:
-            self.progress_bar.setVisible(False)
+        self.progress_bar.setVisible(True)
+        self.progress_bar.setRange(0, 0)
+        self.status_bar.showMessage("در حال خواندن فایل اکسل...")
+        self.process_btn.setEnabled(False)
+        self.cancel_btn.setEnabled(True)
+        self.save_settings()
+        
+        # پردازش اصلی در نخ جداگانه تا پنجره قفل نشود
+        self.worker = ProcessingWorker(
+            self.excel_input.get_path(),
+            self.xml_input.get_path(),
+            self.output_input.get_path(),
+            watch=self.watch_check.isChecked(),
+            save_validation=self.validation_check.isChecked()
+        )
+        self.worker.progress.connect(self.on_progress)
+        self.worker.rebuilt.connect(self.on_rebuilt)
+        self.worker.result.connect(self.on_finished)
+        self.worker.start()
+    
+    def on_progress(self, stage, done, total):
+        # در حالت نظارت on_rebuilt نوار را پنهان می‌کند؛ هر اجرای بعدی دوباره نمایشش می‌دهد
+        self.progress_bar.setVisible(True)
+        if stage == 'load':
+            # total صفر یعنی تعداد ردیف‌ها از قبل معلوم نیست و نوار نامعین می‌ماند
+            self.progress_bar.setRange(0, total)
+            self.progress_bar.setValue(min(done, total))
+            self.status_bar.showMessage(f"{done} ردیف از فایل اکسل خوانده شد")
+        elif stage == 'items':
+            self.progress_bar.setRange(0, max(total, 1))
+            self.progress_bar.setValue(done)
+            self.status_bar.showMessage(f"پردازش آیتم‌ها: {done} از {total}")
+    
+    def on_rebuilt(self, success, message):
+        # نتیجه آخرین اجرا در حالت نظارت؛ پردازشگر منتظر ذخیره بعدی می‌ماند
+        self.preview_text.setPlainText(message)
+        self.progress_bar.setVisible(False)
+        self.status_bar.showMessage("در حال نظارت بر تغییر فایل‌ها؛ برای توقف «لغو» را بزنید")
+    
+    def cancel_processing(self):
+        if self.worker is not None:
+            self.worker.cancel()
+            self.cancel_btn.setEnabled(False)
+            self.status_bar.showMessage("در حال لغو پردازش...")
+    
+    def on_finished(self, success, message):
+        # نمایش نتیجه در بخش پیش‌نمایش
+        self.preview_text.setPlainText(message)
+        self.status_bar.clearMessage()
+        self.progress_bar.setVisible(False)
+        self.process_btn.setEnabled(True)
+        self.cancel_btn.setEnabled(False)
+        self.worker.wait()
+        self.worker = None
     
     def closeEvent(self, event):
+        if self.worker is not None:
+            self.worker.cancel()
+            self.worker.wait()
         self.save_settings()
         event.accept()
\ No newline at end of file
@@ -0,0 +1,79 @@
+import hashlib
+import json
+
+from atomic_output import file_sha256, save_json
+from xml_rewriter import item_pattern
+
+# نسخه قالب manifest؛ با هر تغییری در خروجی شکل‌دهی باید افزایش یابد
+MANIFEST_VERSION = 1
+MANIFEST_SUFFIX = ".manifest"
+
+
+class IncrementalBuild:
+    """
+    بازسازی افزایشی: برای هر کلید اثر انگشت ورودی (متن، ID، حداقل و حداکثر طول)
+    در فایل manifest کنار خروجی قبلی ذخیره می‌شود. در اجرای بعد فقط کلیدهایی که
+    اثر انگشتشان تغییر کرده دوباره شکل‌دهی می‌شوند و بقیه مقدار خروجی قبلی را می‌گیرند.
+    اگر خروجی قبلی بعد از ساخت manifest تغییر کرده باشد، همه کلیدها بازسازی می‌شوند.
+    """
+
+    def __init__(self, output_xml_path):
+        self.output_xml_path = output_xml_path
+        self.manifest_path = output_xml_path + MANIFEST_SUFFIX
+        self.fingerprints = {}
+        self.reused = 0
+        self.rebuilt = 0
+        self._previous_fingerprints = {}
+        self._previous_values = {}
+        self._load_previous()
+
+    @staticmethod
+    def fingerprint(text, id_val, min_len, max_len):
+        data = repr((text, id_val, min_len, max_len)).encode('utf-8')
+        return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+    def can_reuse(self, key, fingerprint):
+        return (
+            self._previous_fingerprints.get(key) == fingerprint
+            and key in self._previous_values
+        )
+
+    def previous(self, key, fingerprint):
+        # مقدار خروجی قبلی (escape شده) یا None اگر کلید باید دوباره پردازش شود
+        if self.can_reuse(key, fingerprint):
+            self.reused += 1
+            return self._previous_values[key]
+        self.rebuilt += 1
+        return None
+
+    def record(self, key, fingerprint):
+        self.fingerprints[key] = fingerprint
+
+    def save(self):
+        manifest = {
+            'version': MANIFEST_VERSION,
+            'output_sha256': file_sha256(self.output_xml_path),
+            'fingerprints': self.fingerprints,
+        }
+        # بدون manifest اجرای بعدی فقط همه کلیدها را دوباره می‌سازد، پس خطای ذخیره مهم نیست
+        save_json(self.manifest_path, manifest)
+
+    def _load_previous(self):
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest.get('version') != MANIFEST_VERSION:
+                return
+            if manifest.get('output_sha256') != file_sha256(self.output_xml_path):
+                return
+            with open(self.output_xml_path, 'r', encoding='utf-8') as f:
+                previous_xml = f.read()
+        except (OSError, ValueError):
+            return
+
+        self._previous_fingerprints = manifest.get('fingerprints', {})
+        self._previous_values = {
+            match.group(1): match.group(2)
+            for match in item_pattern.finditer(previous_xml)
+        }
+
@@ -0,0 +1,166 @@
+import heapq
+import json
+import time
+from collections import Counter
+
+# تعداد کندترین کلیدهایی که در گزارش نگه داشته می‌شوند
+DEFAULT_SLOWEST = 10
+
+
+class RunReport:
+    """
+    گزارش زمان‌بندی یک اجرای process_excel_to_xml.
+    برای هر مرحله زمان واقعی (wall) و زمان پردازنده (CPU) جمع می‌شود؛ مراحل تو در تو
+    از زمان مرحله بیرونی کم می‌شوند تا هر عدد فقط سهم همان مرحله باشد.
+    شمارنده‌ها (پردازش‌شده، ردشده، بدون تغییر و ...) و کندترین کلیدها هم نگه داشته می‌شوند.
+    """
+
+    def __init__(self, slowest=DEFAULT_SLOWEST):
+        self.stages = {}
+        self.counts = Counter()
+        self.info = {}
+        self.slowest_limit = slowest
+        self._slowest = []
+        self._stack = []
+        self._started = None
+
+    def start(self):
+        # فراخوانی دوباره بی‌اثر است تا فراخواننده بتواند زودتر شروع کند (مثلاً پیش از خواندن اکسل)
+        if self._started is None:
+            self._started = (time.perf_counter(), time.process_time())
+
+    def stop(self):
+        if self._started is not None:
+            wall, cpu = self._started
+            self.info['total_wall'] = time.perf_counter() - wall
+            self.info['total_cpu'] = time.process_time() - cpu
+
+    def stage(self, name):
+        return _Stage(self, name)
+
+    def count(self, name, amount=1):
+        self.counts[name] += amount
+
+    def key_time(self, key, seconds):
+        entry = (seconds, key)
+        if len(self._slowest) < self.slowest_limit:
+            heapq.heappush(self._slowest, entry)
+        elif entry > self._slowest[0]:
+            heapq.heapreplace(self._slowest, entry)
+
+    def dedup_ratio(self):
+        # تعداد آیتم‌های شکل‌دهی‌شده به ازای هر متن یکتا؛ None اگر چیزی شکل‌دهی نشده باشد
+        rendered = self.counts.get('rendered', 0)
+        if not rendered:
+            return None
+        return (rendered + self.counts.get('deduplicated', 0)) / rendered
+
+    def slowest_keys(self):
+        return [(key, seconds) for seconds, key in sorted(self._slowest, reverse=True)]
+
+    def as_dict(self):
+        return {
+            'total_wall': self.info.get('total_wall'),
+            'total_cpu': self.info.get('total_cpu'),
+            'stages': {
+                name: {'wall': wall, 'cpu': cpu, 'calls': calls}
+                for name, (wall, cpu, calls) in self.stages.items()
+            },
+            'counts': dict(self.counts),
+            'dedup_ratio': self.dedup_ratio(),
+            'slowest_keys': [{'key': key, 'seconds': seconds} for key, seconds in self.slowest_keys()],
+            'info': {k: v for k, v in self.info.items() if k not in ('total_wall', 'total_cpu')},
+        }
+
+    def format_text(self):
+        lines = []
+        if 'total_wall' in self.info:
+            lines.append(f"زمان کل: {self.info['total_wall']:.3f}s (CPU {self.info['total_cpu']:.3f}s)")
+        lines.append("مراحل:")
+        for name, (wall, cpu, calls) in sorted(self.stages.items(), key=lambda item: -item[1][0]):
+            lines.append(f"  {name:<10} {wall:8.3f}s  CPU {cpu:8.3f}s  ({calls} بار)")
+        if self.counts:
+            lines.append("شمارنده‌ها:")
+            for name, value in sorted(self.counts.items()):
+                lines.append(f"  {name:<10} {value}")
+        ratio = self.dedup_ratio()
+        if ratio is not None:
+            lines.append(f"نسبت یکتاسازی: {ratio:.2f} آیتم به ازای هر متن یکتا")
+        slowest = self.slowest_keys()
+        if slowest:
+            lines.append("کندترین کلیدها:")
+            for key, seconds in slowest:
+                lines.append(f"  {seconds * 1000:8.2f}ms  {key}")
+        return '\n'.join(lines)
+
+
+def write_reports_json(reports, path):
+    # گزارش چند اجرا (هر کار و مراحل مشترک نسخه‌ها) به صورت لیست as_dict در یک فایل JSON
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump([report.as_dict() for report in reports], f, ensure_ascii=False, indent=2)
+
+
+class NullReport:
+    # جایگزین بی‌اثر RunReport وقتی گزارش خواسته نشده است
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def stage(self, name):
+        return _NULL_STAGE
+
+    def count(self, name, amount=1):
+        pass
+
+    def key_time(self, key, seconds):
+        pass
+
+
+class _Stage:
+    __slots__ = ('report', 'name', 'wall', 'cpu', 'child_wall', 'child_cpu')
+
+    def __init__(self, report, name):
+        self.report = report
+        self.name = name
+
+    def __enter__(self):
+        self.child_wall = 0.0
+        self.child_cpu = 0.0
+        self.report._stack.append(self)
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+        return self
+
+    def __exit__(self, *exc):
+        wall = time.perf_counter() - self.wall
+        cpu = time.process_time() - self.cpu
+        stack = self.report._stack
+        stack.pop()
+        if stack:
+            stack[-1].child_wall += wall
+            stack[-1].child_cpu += cpu
+
+        total_wall, total_cpu, calls = self.report.stages.get(self.name, (0.0, 0.0, 0))
+        self.report.stages[self.name] = (
+            total_wall + wall - self.child_wall,
+            total_cpu + cpu - self.child_cpu,
+            calls + 1,
+        )
+        return False
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+NULL_REPORT = NullReport()
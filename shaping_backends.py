@@ -0,0 +1,227 @@
+import functools
+import re
+
+# شکل‌های نمایشی هر حرف: (تنها، ابتدا، میانه، انتها)؛ رشته خالی یعنی حرف آن شکل را ندارد.
+# همان مقادیر جدول LETTERS_ARABIC در arabic_reshaper برای حروف فارسی (و چند حرف عربی رایج)
+PERSIAN_LETTERS = {
+    '\u0621': ('\uFE80', '', '', ''),              # ء
+    '\u0622': ('\uFE81', '', '', '\uFE82'),        # آ
+    '\u0623': ('\uFE83', '', '', '\uFE84'),        # أ
+    '\u0624': ('\uFE85', '', '', '\uFE86'),        # ؤ
+    '\u0625': ('\uFE87', '', '', '\uFE88'),        # إ
+    '\u0626': ('\uFE89', '\uFE8B', '\uFE8C', '\uFE8A'),  # ئ
+    '\u0627': ('\uFE8D', '', '', '\uFE8E'),        # ا
+    '\u0628': ('\uFE8F', '\uFE91', '\uFE92', '\uFE90'),  # ب
+    '\u0629': ('\uFE93', '', '', '\uFE94'),        # ة
+    '\u062A': ('\uFE95', '\uFE97', '\uFE98', '\uFE96'),  # ت
+    '\u062B': ('\uFE99', '\uFE9B', '\uFE9C', '\uFE9A'),  # ث
+    '\u062C': ('\uFE9D', '\uFE9F', '\uFEA0', '\uFE9E'),  # ج
+    '\u062D': ('\uFEA1', '\uFEA3', '\uFEA4', '\uFEA2'),  # ح
+    '\u062E': ('\uFEA5', '\uFEA7', '\uFEA8', '\uFEA6'),  # خ
+    '\u062F': ('\uFEA9', '', '', '\uFEAA'),        # د
+    '\u0630': ('\uFEAB', '', '', '\uFEAC'),        # ذ
+    '\u0631': ('\uFEAD', '', '', '\uFEAE'),        # ر
+    '\u0632': ('\uFEAF', '', '', '\uFEB0'),        # ز
+    '\u0633': ('\uFEB1', '\uFEB3', '\uFEB4', '\uFEB2'),  # س
+    '\u0634': ('\uFEB5', '\uFEB7', '\uFEB8', '\uFEB6'),  # ش
+    '\u0635': ('\uFEB9', '\uFEBB', '\uFEBC', '\uFEBA'),  # ص
+    '\u0636': ('\uFEBD', '\uFEBF', '\uFEC0', '\uFEBE'),  # ض
+    '\u0637': ('\uFEC1', '\uFEC3', '\uFEC4', '\uFEC2'),  # ط
+    '\u0638': ('\uFEC5', '\uFEC7', '\uFEC8', '\uFEC6'),  # ظ
+    '\u0639': ('\uFEC9', '\uFECB', '\uFECC', '\uFECA'),  # ع
+    '\u063A': ('\uFECD', '\uFECF', '\uFED0', '\uFECE'),  # غ
+    '\u0641': ('\uFED1', '\uFED3', '\uFED4', '\uFED2'),  # ف
+    '\u0642': ('\uFED5', '\uFED7', '\uFED8', '\uFED6'),  # ق
+    '\u0643': ('\uFED9', '\uFEDB', '\uFEDC', '\uFEDA'),  # ك
+    '\u0644': ('\uFEDD', '\uFEDF', '\uFEE0', '\uFEDE'),  # ل
+    '\u0645': ('\uFEE1', '\uFEE3', '\uFEE4', '\uFEE2'),  # م
+    '\u0646': ('\uFEE5', '\uFEE7', '\uFEE8', '\uFEE6'),  # ن
+    '\u0647': ('\uFEE9', '\uFEEB', '\uFEEC', '\uFEEA'),  # ه
+    '\u0648': ('\uFEED', '', '', '\uFEEE'),        # و
+    '\u0649': ('\uFEEF', '\uFBE8', '\uFBE9', '\uFEF0'),  # ى
+    '\u064A': ('\uFEF1', '\uFEF3', '\uFEF4', '\uFEF2'),  # ي
+    '\u067E': ('\uFB56', '\uFB58', '\uFB59', '\uFB57'),  # پ
+    '\u0686': ('\uFB7A', '\uFB7C', '\uFB7D', '\uFB7B'),  # چ
+    '\u0698': ('\uFB8A', '', '', '\uFB8B'),        # ژ
+    '\u06A9': ('\uFB8E', '\uFB90', '\uFB91', '\uFB8F'),  # ک
+    '\u06AF': ('\uFB92', '\uFB94', '\uFB95', '\uFB93'),  # گ
+    '\u06CC': ('\uFBFC', '\uFBFE', '\uFBFF', '\uFBFD'),  # ی
+}
+
+ISOLATED, INITIAL, MEDIAL, FINAL = range(4)
+
+# لام و الف (تنها یا انتها)؛ تنها لیگاتورهای حرفی فعال در تنظیمات پیش‌فرض arabic_reshaper
+LAM = '\u0644'
+LAM_ALEF = {
+    '\u0622': ('\uFEF5', '\uFEF6'),  # لآ
+    '\u0623': ('\uFEF7', '\uFEF8'),  # لأ
+    '\u0625': ('\uFEF9', '\uFEFA'),  # لإ
+    '\u0627': ('\uFEFB', '\uFEFC'),  # لا
+}
+
+ZWNJ = '\u200C'
+
+# کاراکترهای خنثی که در خط تمام راست‌به‌چپ جهتشان از حروف اطراف گرفته می‌شود؛
+# جفت‌های آینه‌ای در نمایش راست‌به‌چپ با هم عوض می‌شوند
+_NEUTRALS = ' !"\'&*.:\u060C\u061F\u061B-\u00AB\u00BB()[]{}<>'
+_MIRROR = str.maketrans('\u00AB\u00BB()[]{}<>', '\u00BB\u00AB)(][}{><')
+_DIGITS = '0-9\u06F0-\u06F9\u0660-\u0669'
+
+# خطی که مسیر سریع می‌تواند دقیقاً مثل کتابخانه‌ها شکل دهد: فقط حروف جدول، ZWNJ، خنثی‌ها و ارقام
+_FAST_LINE = re.compile('[%s%s%s%s]+' % (''.join(PERSIAN_LETTERS), ZWNJ, re.escape(_NEUTRALS), _DIGITS))
+# جداکننده کنار رقم (مثل 1.5 یا ۱۲-۳) به عدد می‌چسبد و الگوریتم bidi آن را جابه‌جا نمی‌کند
+_DIGIT_SEPARATOR = re.compile('[%s][.:،\\-]|[.:،\\-][%s]' % (_DIGITS, _DIGITS))
+_DIGIT_RUNS = re.compile('([%s]+)' % _DIGITS)
+# لیگاتور کلمه «الله» (فعال در تنظیمات پیش‌فرض) به کتابخانه سپرده می‌شود
+_ALLAH = 'الله'
+
+
+@functools.lru_cache(maxsize=None)
+def shaping_functions():
+    """
+    بارگذاری تنبل arabic_reshaper و python-bidi؛ این کتابخانه‌ها فقط با اولین خط
+    عربی/فارسی که مسیر سریع نتواند شکل دهد import می‌شوند تا راه‌اندازی برنامه سریع بماند.
+    """
+    import arabic_reshaper
+    from bidi.algorithm import get_display
+    return arabic_reshaper.reshape, get_display
+
+
+class LibraryBackend:
+    # مسیر کامل: arabic_reshaper.reshape و سپس bidi.algorithm.get_display
+    name = 'library'
+
+    def display(self, line):
+        reshape, get_display = shaping_functions()
+        return get_display(reshape(line))
+
+
+class PersianTableBackend:
+    """
+    مسیر سریع جدول‌محور برای خطوط فارسی ساده: شکل حروف از PERSIAN_LETTERS (با همان قواعد
+    اتصال arabic_reshaper و لیگاتور لا) و سپس معکوس کردن ساده خط، با حفظ ترتیب ارقام و
+    آینه کردن پرانتزها و گیومه‌ها؛ این دقیقاً خروجی الگوریتم bidi برای خطی است که فقط حروف
+    راست‌به‌چپ، خنثی‌ها و ارقام دارد. خطوط دیگر (حروف لاتین، اعراب، ZWJ، «الله»، عدد با
+    جداکننده و ...) به fallback سپرده می‌شوند. benchmarks/check_shaping_backend.py
+    برابری دو مسیر را روی کل متن‌ها بررسی می‌کند.
+    """
+    name = 'persian'
+
+    def __init__(self, fallback=None):
+        self.fallback = LibraryBackend() if fallback is None else fallback
+
+    def display(self, line):
+        shaped = table_display(line)
+        if shaped is None:
+            return self.fallback.display(line)
+        return shaped
+
+
+def table_display(line):
+    # خروجی نمایشی خط با مسیر سریع، یا None اگر خط خارج از پوشش آن باشد
+    if not _FAST_LINE.fullmatch(line) or _ALLAH in line:
+        return None
+    # الگوریتم bidi کاراکتر ZWNJ را نادیده می‌گیرد، پس «1‌:‌3» هم عدد با جداکننده است
+    if _DIGIT_SEPARATOR.search(line.replace(ZWNJ, '') if ZWNJ in line else line):
+        return None
+    shaped = _reshape(line)
+    if shaped is None:
+        return None
+    if ZWNJ in shaped:
+        # ZWNJ فقط اتصال حروف را قطع می‌کند و bidi آن را از خروجی حذف می‌کند
+        shaped = shaped.replace(ZWNJ, '')
+
+    # همه سطوح راست‌به‌چپ هستند جز ارقام که ترتیب خودشان را نگه می‌دارند
+    parts = _DIGIT_RUNS.split(shaped)
+    for i in range(0, len(parts), 2):
+        parts[i] = parts[i][::-1].translate(_MIRROR)
+    parts.reverse()
+    return ''.join(parts)
+
+
+def _reshape(line):
+    # همان ماشین حالت arabic_reshaper.reshape برای حروف جدول؛ None اگر خط حرفی نداشته باشد
+    # (بدون حرف قوی، جهت پاراگراف چپ‌به‌راست است و معکوس کردن درست نیست)
+    entries = []
+    forms = []
+    has_letter = False
+    previous = None
+    previous_form = -1
+    for char in line:
+        entry = PERSIAN_LETTERS.get(char)
+        if entry is None:
+            form = -1
+            has_letter = has_letter or char in '؟؛'
+        else:
+            has_letter = True
+            if (previous_form == -1 or not (entry[FINAL] or entry[MEDIAL])
+                    or not (previous[INITIAL] or previous[MEDIAL])
+                    or (previous_form == FINAL and not previous[MEDIAL])):
+                form = ISOLATED
+            elif previous_form == ISOLATED:
+                forms[-1] = INITIAL
+                form = FINAL
+            else:
+                forms[-1] = MEDIAL
+                form = FINAL
+        entries.append(entry)
+        forms.append(form)
+        previous, previous_form = entry, form
+
+    if not has_letter:
+        return None
+
+    result = []
+    skip = False
+    for i, char in enumerate(line):
+        if skip:
+            skip = False
+            continue
+        form = forms[i]
+        if form == -1:
+            result.append(char)
+            continue
+        if char == LAM and i + 1 < len(line) and line[i + 1] in LAM_ALEF:
+            # لیگاتور تنها اگر لام به حرف قبل وصل نباشد (الف هیچ‌وقت به بعد وصل نمی‌شود)
+            isolated, final = LAM_ALEF[line[i + 1]]
+            result.append(isolated if form in (ISOLATED, INITIAL) else final)
+            skip = True
+            continue
+        result.append(entries[i][form])
+    return ''.join(result)
+
+
+BACKENDS = {}
+
+
+def register_backend(backend):
+    BACKENDS[backend.name] = backend
+
+
+register_backend(LibraryBackend())
+register_backend(PersianTableBackend(BACKENDS['library']))
+
+DEFAULT_BACKEND = 'persian'
+_active = BACKENDS[DEFAULT_BACKEND]
+
+
+def set_backend(name):
+    """
+    انتخاب مسیر شکل‌دهی خطوط فارسی/عربی ('persian' یا 'library')؛ خروجی هر دو یکسان است.
+    نتایج کش‌شده ShapingEngine عوض نمی‌شوند.
+    """
+    global _active
+    try:
+        _active = BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"مسیر شکل‌دهی ناشناخته: {name} (موجود: {', '.join(BACKENDS)})")
+    return _active
+
+
+def get_backend():
+    return _active
+
+
+def display_line(line):
+    # شکل نمایشی یک خط (اصلاح حروف و ترتیب راست‌به‌چپ) با مسیر فعال
+    return _active.display(line)
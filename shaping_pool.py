@@ -0,0 +1,72 @@
+import os
+
+from xml_escape import escape_values
+from xml_rewriter import ProcessingCancelled
+
+# زیر این تعداد متن یکتا، هزینه راه‌اندازی پروسه‌ها از سود موازی‌سازی بیشتر است
+PARALLEL_MIN_JOBS = 256
+
+# هر پروسه چند تکه کار می‌گیرد تا بار بین هسته‌ها متعادل بماند
+CHUNKS_PER_WORKER = 4
+
+# فاصله بررسی لغو هنگام انتظار برای نتیجه پروسه‌ها (ثانیه)
+CANCEL_POLL_INTERVAL = 0.1
+
+
+def shape_parallel(process, jobs, workers, linebreaker="\n", cancel=None):
+    """
+    اجرای process(text, min_len, max_len, linebreaker) برای لیست jobs از (text, min_len, max_len)
+    روی چند پروسه. نتایج به همان ترتیب jobs برگردانده می‌شوند.
+    process باید تابعی در سطح ماژول باشد تا قابل pickle شدن باشد.
+    اگر cancel() مقدار True برگرداند تکه‌های شروع‌نشده لغو و ProcessingCancelled رخ می‌دهد.
+    """
+    jobs = list(jobs)
+    if workers is None or workers <= 0:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or not jobs:
+        return [process(text, min_len, max_len, linebreaker) for text, min_len, max_len in jobs]
+
+    chunk_size = max(1, -(-len(jobs) // (workers * CHUNKS_PER_WORKER)))
+    chunks = [jobs[i:i + chunk_size] for i in range(0, len(jobs), chunk_size)]
+
+    # multiprocessing فقط در حالت موازی import می‌شود
+    from concurrent.futures import ProcessPoolExecutor, wait
+
+    results = []
+    cancelled = False
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        futures = [executor.submit(_shape_chunk, process, chunk, linebreaker) for chunk in chunks]
+        for future in futures:
+            # هنگام انتظار برای هر تکه، لغو هر CANCEL_POLL_INTERVAL ثانیه بررسی می‌شود
+            while cancel is not None:
+                if cancel():
+                    cancelled = True
+                    raise ProcessingCancelled()
+                if wait([future], timeout=CANCEL_POLL_INTERVAL).done:
+                    break
+            results.extend(future.result())
+    finally:
+        # با لغو، تکه‌های شروع‌نشده کنار گذاشته می‌شوند و منتظر تکه‌های در حال اجرا نمی‌مانیم
+        executor.shutdown(wait=not cancelled, cancel_futures=cancelled)
+    return results
+
+
+def should_parallelize(workers, job_count):
+    return workers is not None and workers != 1 and job_count >= PARALLEL_MIN_JOBS
+
+
+def _shape_chunk(process, chunk, linebreaker):
+    return [process(text, min_len, max_len, linebreaker) for text, min_len, max_len in chunk]
+
+
+def preshape_jobs(process, jobs, workers, cancel=None):
+    """
+    شکل‌دهی موازی و escape گروهی متن‌های یکتای jobs از (text, min_len, max_len).
+    خروجی دیکشنری (text, min_len, max_len) → مقدار نهایی (escape شده) است؛ برای ورودی‌های
+    کوچک دیکشنری خالی برمی‌گردد تا مسیر سریالی معمول (با کش engine) استفاده شود.
+    """
+    jobs = list(jobs)
+    if not should_parallelize(workers, len(jobs)):
+        return {}
+    return dict(zip(jobs, escape_values(shape_parallel(process, jobs, workers, cancel=cancel))))
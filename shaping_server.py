@@ -0,0 +1,256 @@
+import http.client
+import json
+import os
+import socket
+import socketserver
+import stat
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from xml_escape import escape_value
+
+# آدرس پیش‌فرض سرویس؛ فقط روی localhost گوش داده می‌شود
+DEFAULT_ADDRESS = "127.0.0.1:8765"
+UNIX_PREFIX = "unix:"
+
+# حداکثر اندازه بدنه یک درخواست (بایت)
+MAX_REQUEST_SIZE = 64 << 20
+
+
+class ShapingRequestError(ValueError):
+    pass
+
+
+def parse_address(address):
+    """
+    «host:port» یا «:port» برای TCP و «unix:/path/to.sock» برای سوکت یونیکس.
+    برگشتی: ('unix', path) یا ('tcp', (host, port)).
+    """
+    if address.startswith(UNIX_PREFIX):
+        return 'unix', address[len(UNIX_PREFIX):]
+    host, _, port = address.rpartition(':')
+    try:
+        return 'tcp', (host or "127.0.0.1", int(port))
+    except ValueError:
+        raise ValueError(f"آدرس نامعتبر: {address} (نمونه: 127.0.0.1:8765 یا unix:/tmp/shaper.sock)")
+
+
+def shape_batch(engine, request):
+    """
+    اجرای یک درخواست دسته‌ای روی engine (ShapingEngine با process_text):
+        {"items": [[text, min_len, max_len], ...] یا [{"text": ..., "min_len": ..., "max_len": ...,
+         "linebreaker": ...}, ...], "linebreaker": "\\n", "escape": false}
+    linebreaker هر آیتم اختیاری است و پیش‌فرض آن linebreaker درخواست است.
+    با escape=true خروجی مثل مقدار ویژگی XML (escape_value) برگردانده می‌شود.
+    """
+    if not isinstance(request, dict) or not isinstance(request.get('items'), list):
+        raise ShapingRequestError("بدنه درخواست باید شیء JSON با لیست items باشد")
+    default_linebreaker = request.get('linebreaker', "\n")
+    escape = bool(request.get('escape', False))
+
+    results = []
+    for position, item in enumerate(request['items']):
+        try:
+            if isinstance(item, dict):
+                text = item.get('text')
+                min_len, max_len = item.get('min_len', 0), item.get('max_len', 0)
+                linebreaker = item.get('linebreaker', default_linebreaker)
+            else:
+                text, min_len, max_len, *rest = item
+                linebreaker = rest[0] if rest else default_linebreaker
+            min_len, max_len = int(min_len), int(max_len)
+        except (TypeError, ValueError):
+            raise ShapingRequestError(f"آیتم {position} نامعتبر است: {item!r}")
+        if not isinstance(linebreaker, str):
+            raise ShapingRequestError(f"linebreaker آیتم {position} باید رشته باشد")
+        if text is not None and not isinstance(text, (str, int, float)):
+            raise ShapingRequestError(f"text آیتم {position} باید رشته، عدد یا null باشد")
+
+        shaped = engine.shape(text, min_len, max_len, linebreaker)
+        results.append(escape_value(shaped) if escape else shaped)
+    return results
+
+
+class ShapingRequestHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 تا کلاینت‌ها اتصال را بین درخواست‌ها نگه دارند
+    protocol_version = "HTTP/1.1"
+    # سرآیند و بدنه پاسخ جدا نوشته می‌شوند؛ بدون TCP_NODELAY هر پاسخ منتظر ACK تأخیری (~40ms) می‌ماند
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        if self.path != '/shape':
+            return self._send(404, {'error': f"مسیر ناشناخته: {self.path}"})
+        try:
+            length = self._content_length()
+            request = json.loads(self.rfile.read(length).decode('utf-8'))
+            results = shape_batch(self.server.engine, request)
+        except (ValueError, UnicodeDecodeError) as e:
+            return self._send(400, {'error': str(e)})
+        except Exception as e:
+            # خطای کتابخانه‌های شکل‌دهی (مثلاً IndexError در python-bidi) بدون پاسخ اتصال را
+            # قطع می‌کرد؛ بدنه کامل خوانده شده پس اتصال ماندگار سالم می‌ماند
+            self.log_error("خطای شکل‌دهی: %r", e)
+            return self._send(500, {'error': f"خطای شکل‌دهی: {e.__class__.__name__}: {e}"})
+        self.server.record(len(results))
+        self._send(200, {'results': results})
+
+    def do_GET(self):
+        if self.path == '/health':
+            return self._send(200, {'status': 'ok'})
+        if self.path == '/stats':
+            return self._send(200, self.server.stats())
+        self._send(404, {'error': f"مسیر ناشناخته: {self.path}"})
+
+    def _content_length(self):
+        # طول نامعتبر یعنی بدنه خوانده نمی‌شود؛ اتصال بعد از پاسخ 400 بسته می‌شود تا بقیه
+        # بدنه به عنوان درخواست بعدی خوانده نشود (rfile.read(-1) تا بسته شدن اتصال منتظر می‌ماند)
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+        except ValueError:
+            self.close_connection = True
+            raise ShapingRequestError("سرآیند Content-Length نامعتبر است")
+        if length < 0:
+            self.close_connection = True
+            raise ShapingRequestError("سرآیند Content-Length منفی است")
+        if length > MAX_REQUEST_SIZE:
+            self.close_connection = True
+            raise ShapingRequestError(f"درخواست بزرگ‌تر از {MAX_REQUEST_SIZE} بایت است")
+        return length
+
+    def _send(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        if self.close_connection:
+            self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # لاگ هر درخواست فقط در حالت verbose؛ client_address سوکت یونیکس رشته خالی است
+        if self.server.verbose:
+            print(f"[{self.log_date_time_string()}] {format % args}")
+
+
+class _UnixShapingRequestHandler(ShapingRequestHandler):
+    # TCP_NODELAY روی سوکت یونیکس پشتیبانی نمی‌شود (و لازم هم نیست)
+    disable_nagle_algorithm = False
+
+
+class _ShapingServerMixin:
+    daemon_threads = True
+
+    def setup_engine(self, engine, verbose):
+        self.engine = engine
+        self.verbose = verbose
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.items = 0
+
+    def record(self, items):
+        with self._lock:
+            self.requests += 1
+            self.items += items
+
+    def stats(self):
+        with self._lock:
+            return {'requests': self.requests, 'items': self.items, 'cache': self.engine.stats()}
+
+
+class TcpShapingServer(_ShapingServerMixin, ThreadingHTTPServer):
+    pass
+
+
+class UnixShapingServer(_ShapingServerMixin, socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+
+    def server_close(self):
+        super().server_close()
+        if _is_socket(self.server_address):
+            os.unlink(self.server_address)
+
+
+def make_server(address, engine, verbose=False):
+    """
+    ساخت سرور شکل‌دهی روی address (مثل parse_address). هر اتصال در یک نخ جدا سرویس
+    می‌گیرد و همه نخ‌ها engine و کش LRU آن را مشترک استفاده می‌کنند، پس کتابخانه‌های
+    شکل‌دهی و متن‌های پرتکرار بین درخواست‌ها گرم می‌مانند.
+    """
+    kind, target = parse_address(address)
+    if kind == 'unix':
+        # فقط فایل سوکت باقی‌مانده از اجرای قبلی حذف می‌شود؛ هر فایل دیگری (مثلاً با اشتباه
+        # تایپی unix:Book1.xlsx) دست نمی‌خورد
+        if _is_socket(target):
+            os.unlink(target)
+        elif os.path.lexists(target):
+            raise FileExistsError(f"مسیر {target} وجود دارد و سوکت نیست؛ مسیر دیگری برای سرویس انتخاب کنید")
+        server = UnixShapingServer(target, _UnixShapingRequestHandler)
+    else:
+        server = TcpShapingServer(target, ShapingRequestHandler)
+    server.setup_engine(engine, verbose)
+    return server
+
+
+def _is_socket(path):
+    try:
+        return stat.S_ISSOCK(os.lstat(path).st_mode)
+    except OSError:
+        return False
+
+
+def serve(address, engine, verbose=False):
+    server = make_server(address, engine, verbose)
+    print(f"سرویس شکل‌دهی روی {address} آماده است (Ctrl+C برای توقف)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+
+    def __init__(self, path, timeout=None):
+        super().__init__('localhost', timeout=timeout)
+        self._path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self._path)
+
+
+class ShapingClient:
+    """
+    کلاینت ساده سرویس با یک اتصال ماندگار، برای ابزارهای پایتونی:
+        client = ShapingClient("127.0.0.1:8765")
+        client.shape([("متن", 26, 32)], escape=True)
+    """
+
+    def __init__(self, address=DEFAULT_ADDRESS, timeout=30):
+        kind, target = parse_address(address)
+        if kind == 'unix':
+            self._connection = _UnixHTTPConnection(target, timeout=timeout)
+        else:
+            self._connection = http.client.HTTPConnection(*target, timeout=timeout)
+
+    def shape(self, items, escape=False, linebreaker="\n"):
+        request = {'items': [list(item) for item in items], 'escape': escape, 'linebreaker': linebreaker}
+        return self._request('POST', '/shape', request)['results']
+
+    def stats(self):
+        return self._request('GET', '/stats')
+
+    def close(self):
+        self._connection.close()
+
+    def _request(self, method, path, payload=None):
+        body = None if payload is None else json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        self._connection.request(method, path, body=body, headers=headers)
+        response = self._connection.getresponse()
+        data = json.loads(response.read().decode('utf-8'))
+        if response.status != 200:
+            raise ShapingRequestError(data.get('error', f"HTTP {response.status}"))
+        return data
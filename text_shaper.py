@@ -0,0 +1,209 @@
+import functools
+import re
+import sys
+
+from shaping_backends import display_line
+
+# تعداد پیش‌فرض نتایج نگه‌داشته‌شده در کش
+DEFAULT_CACHE_SIZE = 8192
+
+# الگوی تشخیص حروف عربی/فارسی؛ یک بار کامپایل می‌شود
+arabic_regex = re.compile(r'[\u0600-\u08FF\uFB50-\uFEFF]')
+
+# کاراکترهایی که str.splitlines آن‌ها را پایان خط می‌داند
+_LINE_BOUNDARIES = re.compile(r'[\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]')
+
+# فاصله‌هایی که str.lstrip حذف می‌کند (\s در حالت یونیکد همان str.isspace است)
+_LEADING_SPACE = re.compile(r'\s*')
+
+
+def is_missing(value):
+    # معادل pd.isna برای یک مقدار، بدون import کردن pandas
+    if value is None:
+        return True
+    if isinstance(value, str):
+        return False
+    if isinstance(value, float):
+        return value != value
+    pandas = sys.modules.get('pandas')
+    return pandas is not None and bool(pandas.isna(value))
+
+
+def shape_text(text, min_len, max_len, linebreaker):
+    """
+    معادل تک‌گذره زنجیره add_linebreaks → reshape_arabic → rearrange_sentences.
+    هر خط فقط یک بار جدا می‌شود و شکستن، اصلاح حروف و معکوس کردن جملات
+    پشت سر هم روی همان خط انجام می‌شود. خروجی بایت به بایت با زنجیره قبلی یکسان است.
+    """
+    wrap = min_len > 0 and max_len > 0 and max_len > min_len
+
+    # جداکننده‌ای که خود شامل پایان خط (غیر از \n) باشد در زنجیره قبلی دوباره
+    # شکسته می‌شد؛ این حالت نادر همان مسیر سه‌مرحله‌ای را طی می‌کند
+    if wrap and linebreaker != "\n" and _LINE_BOUNDARIES.search(linebreaker):
+        return _shape_text_chain(text, min_len, max_len, linebreaker)
+
+    split_wrapped = wrap and linebreaker == "\n"
+    output_lines = []
+    # برای هر خط خروجی: 1 اگر بعد از شکستن خالی بود، 2 اگر بعد از اصلاح حروف خالی شد
+    empty_stage = []
+
+    for line in text.splitlines():
+        if not arabic_regex.search(line):
+            output_lines.append(line)
+            empty_stage.append(0 if line else 1)
+            continue
+
+        if wrap:
+            parts = wrap_line(line, min_len, max_len)
+            if split_wrapped:
+                pieces = parts
+            else:
+                pieces = [linebreaker.join(parts)]
+        else:
+            pieces = [line]
+
+        for piece in pieces:
+            if not piece:
+                output_lines.append(piece)
+                empty_stage.append(1)
+                continue
+            if piece is line or arabic_regex.search(piece):
+                piece = display_line(piece)
+                if arabic_regex.search(piece):
+                    piece = _reverse_sentences(piece, linebreaker)
+            output_lines.append(piece)
+            empty_stage.append(0 if piece else 2)
+
+    # زنجیره قبلی بین مراحل با join/splitlines یک خط خالی انتهایی را حذف می‌کرد
+    if wrap and output_lines and empty_stage[-1] == 1:
+        output_lines.pop()
+        empty_stage.pop()
+    if output_lines and empty_stage[-1]:
+        output_lines.pop()
+
+    return '\n'.join(output_lines)
+
+
+def wrap_line(line, min_len, max_len):
+    """
+    شکستن یک خط به تکه‌هایی حداکثر max_len کاراکتری، در آخرین فاصله بین min_len و max_len
+    (یا دقیقاً در max_len اگر فاصله‌ای نبود)؛ فاصله‌های ابتدای تکه بعدی حذف می‌شوند.
+    همه نقاط شکست با یک پیمایش خطی روی همان رشته پیدا می‌شوند و برخلاف حلقه قبلی،
+    باقی‌مانده خط در هر مرحله کپی و lstrip نمی‌شود.
+    """
+    length = len(line)
+    if length <= max_len:
+        return [line]
+    if min_len < 0 or max_len <= 0:
+        return _wrap_line_slices(line, min_len, max_len)
+
+    parts = []
+    start = 0
+    while length - start > max_len:
+        split_pos = line.rfind(' ', start + min_len, start + max_len)
+        if split_pos == -1:
+            split_pos = start + max_len
+        parts.append(line[start:split_pos])
+        # معمولاً فقط همان یک فاصله محل شکست باید رد شود
+        start = split_pos
+        if line[start].isspace():
+            start += 1
+            if start < length and line[start].isspace():
+                start = _LEADING_SPACE.match(line, start).end()
+    parts.append(line[start:])
+    return parts
+
+
+def _wrap_line_slices(line, min_len, max_len):
+    # حلقه اصلی؛ برای چیدمان‌های غیرعادی (اندیس منفی) که معنای نسبی rfind را عوض می‌کنند
+    parts = []
+    while len(line) > max_len:
+        split_pos = line.rfind(' ', min_len, max_len)
+        if split_pos == -1:
+            split_pos = max_len
+        parts.append(line[:split_pos])
+        line = line[split_pos:].lstrip()
+    parts.append(line)
+    return parts
+
+
+def id_layouts(id_settings):
+    """
+    جدول چیدمان هر ID: ID → (min_len, max_len)، یک بار برای هر فایل اکسل ساخته می‌شود
+    تا برای هر آیتم فقط یک جستجوی dict لازم باشد. ID صفر یعنی بدون محدودیت طول و
+    مثل قبل همیشه (0, 0) است، حتی اگر در ستون‌های تنظیمات ردیفی داشته باشد.
+    """
+    layouts = {
+        id_val: (settings['min_len'], settings['max_len'])
+        for id_val, settings in id_settings.items()
+    }
+    layouts[0] = (0, 0)
+    return layouts
+
+
+def _reverse_sentences(line, linebreaker):
+    sentences = [s.strip() for s in line.split(linebreaker) if s.strip()]
+    sentences.reverse()
+    return linebreaker.join(sentences)
+
+
+def _shape_text_chain(text, min_len, max_len, linebreaker):
+    lines = []
+    for line in text.splitlines():
+        if arabic_regex.search(line):
+            line = linebreaker.join(wrap_line(line, min_len, max_len))
+        lines.append(line)
+
+    lines = '\n'.join(lines).splitlines()
+    for i, line in enumerate(lines):
+        if arabic_regex.search(line):
+            lines[i] = display_line(line)
+
+    lines = '\n'.join(lines).splitlines()
+    for i, line in enumerate(lines):
+        if arabic_regex.search(line):
+            lines[i] = _reverse_sentences(line, linebreaker)
+
+    return '\n'.join(lines)
+
+
+class ShapingEngine:
+    """
+    موتور شکل‌دهی متن با کش LRU محدود.
+    نتیجه process_text بر اساس (متن، حداقل طول، حداکثر طول، جداکننده خط) نگه‌داری می‌شود
+    تا رشته‌های تکراری (نام واحدها، دکمه‌ها، کلیدها) فقط یک بار پردازش شوند.
+    """
+
+    def __init__(self, process, maxsize=DEFAULT_CACHE_SIZE):
+        self.process = process
+        self.resize(maxsize)
+
+    def shape(self, text, min_len, max_len, linebreaker):
+        return self._cached(text, min_len, max_len, linebreaker)
+
+    def resize(self, maxsize):
+        # typed=True تا مثلاً 1 و 1.0 (با خروجی متنی متفاوت) یکی فرض نشوند
+        self.maxsize = maxsize
+        self._cached = functools.lru_cache(maxsize=maxsize, typed=True)(self.process)
+
+    def clear(self):
+        self._cached.cache_clear()
+
+    @property
+    def hits(self):
+        return self._cached.cache_info().hits
+
+    @property
+    def misses(self):
+        return self._cached.cache_info().misses
+
+    def stats(self):
+        info = self._cached.cache_info()
+        total = info.hits + info.misses
+        return {
+            'hits': info.hits,
+            'misses': info.misses,
+            'size': info.currsize,
+            'maxsize': info.maxsize,
+            'hit_ratio': info.hits / total if total else 0.0,
+        }
@@ -0,0 +1,303 @@
+import time
+
+from incremental import IncrementalBuild
+from run_report import NULL_REPORT
+from shaping_backends import display_line
+from shaping_pool import preshape_jobs
+from text_shaper import ShapingEngine, arabic_regex, is_missing, shape_text, wrap_line
+from translation_table import load_table
+from validation import NULL_VALIDATION
+from xml_escape import escape_value
+from xml_index import load_index
+from xml_rewriter import ProcessingCancelled, iter_items, rewrite_xml
+
+
+class TranslationPipeline:
+    """
+    خط لوله مشترک رابط گرافیکی (xml_processor) و خط فرمان (No_Gui) برای ساخت یک فایل خروجی:
+
+        load   خواندن فایل اکسل (یا کش آن) و ساخت جدول ترجمه
+        plan   بازسازی افزایشی، شکل‌دهی موازی متن‌های یکتا و شاخص بایتی XML مبدأ
+        shape  شکل‌دهی یک متن با engine (کش LRU)
+        render مقدار نهایی escape شده یک کلید (خروجی قبلی، متن تکراری، شکل‌دهی موازی یا shape)
+        write  بازنویسی XML و ذخیره اتمیک خروجی
+
+    run همه مراحل را به ترتیب اجرا می‌کند. کش (engine)، موازی‌سازی (workers)، گزارش زمان‌بندی
+    (report)، کنترل کیفیت (validation) و پیشرفت/لغو (progress، cancel) همین‌جا وصل می‌شوند.
+    progress(stage, done, total) با stage برابر 'load' (ردیف‌های خوانده‌شده اکسل؛ total صفر یعنی
+    نامعلوم) یا 'items' (آیتم‌های پردازش‌شده XML از کل) صدا زده می‌شود. cancel حین خواندن اکسل،
+    بین تکه‌های شکل‌دهی موازی و حین نوشتن بررسی می‌شود و اگر True برگرداند ProcessingCancelled
+    رخ می‌دهد و فایل خروجی دست نمی‌خورد.
+    index (شاخص xml_index همین XML) برای استفاده مشترک یک شاخص بین چند خروجی است (build_variants).
+    """
+
+    def __init__(self, xml_path, output_xml_path, engine=None, stream=False, incremental=False,
+                 workers=1, indexed=False, report=None, validation=None, progress=None, cancel=None,
+                 index=None):
+        self.xml_path = xml_path
+        self.output_xml_path = output_xml_path
+        self.engine = shaping_engine if engine is None else engine
+        self.stream = stream
+        self.incremental = incremental
+        self.workers = workers
+        self.indexed = indexed or index is not None
+        # بدون report هیچ زمانی ثبت نمی‌شود
+        self.report = NULL_REPORT if report is None else report
+        self.validation = NULL_VALIDATION if validation is None else validation
+        self.progress = progress
+        self.cancel = cancel
+
+        self.table = None
+        self.build = None
+        self.index = index
+        self.changed = None
+        # مقادیر آماده شکل‌دهی موازی با کلید (متن، حداقل، حداکثر)
+        self._preshaped = {}
+        # مقدار نهایی هر متن یکتا برای پخش بین همه کلیدهایی که همان متن و چیدمان را دارند
+        self._values = {}
+
+    def run(self, excel_path=None, refresh_cache=False, table=None):
+        # برگشتی مثل write: False یعنی خروجی از قبل همین محتوا را داشت
+        report = self.report
+        report.start()
+        cache_before = self.engine.stats()
+        try:
+            self.load(excel_path, refresh_cache, table)
+            self.plan()
+            return self.write()
+        finally:
+            cache_after = self.engine.stats()
+            report.count('cache_hits', cache_after['hits'] - cache_before['hits'])
+            report.count('cache_misses', cache_after['misses'] - cache_before['misses'])
+            report.stop()
+
+    def load(self, excel_path=None, refresh_cache=False, table=None):
+        # در حالت دسته‌ای جدول از قبل ساخته شده و فقط استفاده می‌شود
+        if table is None:
+            load_progress = None
+            if self.progress is not None:
+                load_progress = lambda done, total: self.progress('load', done, total)
+            with self.report.stage('load'):
+                table = load_table(excel_path, refresh_cache=refresh_cache, progress=load_progress,
+                                   cancel=self.cancel)
+        self.table = table
+
+        if self.cancel is not None and self.cancel():
+            raise ProcessingCancelled()
+        return table
+
+    def plan(self):
+        # بازسازی افزایشی: فقط کلیدهایی که ورودی‌شان تغییر کرده پردازش می‌شوند
+        if self.incremental:
+            self.build = IncrementalBuild(self.output_xml_path)
+
+        # شاخص بایتی آیتم‌های XML مبدأ؛ با آن به جای regex روی کل فایل فقط آیتم‌های تغییرکرده
+        # نوشته می‌شوند و بقیه فایل مستقیماً کپی می‌شود
+        if self.indexed and self.index is None:
+            with self.report.stage('index'):
+                self.index = load_index(self.xml_path)
+
+        # شکل‌دهی موازی و escape گروهی متن‌های یکتا (برای ورودی‌های کوچک خالی می‌ماند)
+        if self.workers != 1:
+            with self.report.stage('plan'):
+                self.use_preshaped(preshape_jobs(self.engine.process, self.pending(), self.workers,
+                                                 cancel=self.cancel))
+
+    def pending(self):
+        """
+        متن‌های یکتای (text, min_len, max_len) که write باید شکل‌دهی کند، برای شکل‌دهی
+        موازی پیش از نوشتن؛ کلیدهای قابل استفاده مجدد بازسازی افزایشی کنار گذاشته می‌شوند.
+        """
+        if self.index is not None:
+            items = ((key, value) for key, value, _, _ in self.index.items)
+        else:
+            items = (match.group(1, 2) for match in iter_items(self.xml_path))
+
+        build = self.build
+        seen = set()
+        for key, value in items:
+            resolved = self.table.resolve(key, value)
+            if resolved is None:
+                continue
+            text, id_val, min_len, max_len = resolved
+            if not isinstance(text, str) or (text, min_len, max_len) in seen:
+                continue
+            if build is not None and build.can_reuse(key, build.fingerprint(text, id_val, min_len, max_len)):
+                continue
+            seen.add((text, min_len, max_len))
+            yield text, min_len, max_len
+
+    def use_preshaped(self, preshaped):
+        # مقادیر آماده (text, min_len, max_len) → مقدار escape شده، مثلاً مشترک بین چند خروجی
+        self._preshaped = preshaped
+
+    def shape(self, key, text, min_len, max_len):
+        # زمان شکل‌دهی هر کلید برای فهرست کندترین کلیدها
+        started = time.perf_counter()
+        with self.report.stage('shape'):
+            shaped = self.engine.shape(text, min_len, max_len, "\n")
+        self.report.key_time(key, time.perf_counter() - started)
+        return shaped
+
+    def render(self, key, text, id_val, min_len, max_len):
+        report = self.report
+        build = self.build
+        if build is not None:
+            fingerprint = build.fingerprint(text, id_val, min_len, max_len)
+            build.record(key, fingerprint)
+            value = build.previous(key, fingerprint)
+            if value is not None:
+                report.count('reused')
+                return value
+
+        # هر متن یکتا با چیدمان یکسان فقط یک بار شکل‌دهی و escape می‌شود؛ نوع متن هم
+        # جزو کلید است چون مثلاً 1 و 1.0 برابرند ولی خروجی متنی متفاوت دارند
+        unique_key = (text.__class__, text, min_len, max_len)
+        value = self._values.get(unique_key)
+        if value is not None:
+            report.count('deduplicated')
+            return value
+        report.count('rendered')
+
+        value = self._preshaped.get((text, min_len, max_len))
+        if value is None:
+            shaped = self.shape(key, text, min_len, max_len)
+            with report.stage('escape'):
+                value = convert_special_chars(shaped)
+        self._values[unique_key] = value
+        return value
+
+    def write(self):
+        self.validation.begin(self.output_xml_path)
+        item_progress = None
+        if self.progress is not None:
+            item_progress = lambda done, total: self.progress('items', done, total)
+        self.changed = rewrite_xml(self.xml_path, self.output_xml_path, self._replace_item, stream=self.stream,
+                                   progress=item_progress, cancel=self.cancel, report=self.report,
+                                   index=self.index)
+        self.validation.finish(self.table)
+        if self.build is not None:
+            self.build.save()
+        return self.changed
+
+    def _replace_item(self, match):
+        key = match.group(1)
+        self.validation.see(key)
+        # None یعنی آیتم بدون تغییر می‌ماند (کلید در اکسل نیست یا ID آن نه صفر است و نه در تنظیمات وجود دارد)
+        resolved = self.table.resolve(key, match.group(2))
+        if resolved is None:
+            self.report.count('skipped')
+            return match.group(0)
+
+        self.report.count('processed')
+        value = self.render(key, *resolved)
+        self.validation.check(key, *resolved, value)
+        record = f'<item key="{key}" value="{value}" />'
+        if record == match.group(0):
+            self.report.count('unchanged')
+        return record
+
+
+def build_variants(xml_path, variants, engine=None, workers=1, incremental=False, refresh_cache=False,
+                   tables=None, reports=None, validation=None, report=None):
+    """
+    ساخت چند نسخه ترجمه (فارسی، عربی، نسخه آزمایشی و ...) از یک XML مبدأ در یک اجرا.
+    variants لیست (excel_path, output_xml_path) است؛ tables و reports (اختیاری) هم‌ترتیب با
+    variants جدول ترجمه از قبل خوانده‌شده و RunReport هر نسخه هستند.
+    XML مبدأ فقط یک بار شاخص‌گذاری می‌شود و همه نسخه‌ها از همان شاخص بازنویسی می‌شوند.
+    متن‌های یکتای همه نسخه‌ها با هم جمع و در یک مجموعه پروسه (workers) شکل‌دهی می‌شوند؛
+    با workers=1 شکل‌دهی سریالی است ولی engine و کش آن بین نسخه‌ها مشترک است.
+    مراحل مشترک (index، plan) در report ثبت می‌شوند. لیست pipelineها برگردانده می‌شود.
+    """
+    engine = shaping_engine if engine is None else engine
+    report = NULL_REPORT if report is None else report
+    report.start()
+
+    with report.stage('index'):
+        index = load_index(xml_path)
+
+    pipelines = []
+    for position, (excel_path, output_xml_path) in enumerate(variants):
+        pipeline = TranslationPipeline(xml_path, output_xml_path, engine=engine, incremental=incremental,
+                                       report=reports[position] if reports is not None else None,
+                                       validation=validation, index=index)
+        pipeline.report.start()
+        pipeline.load(excel_path, refresh_cache, tables[position] if tables is not None else None)
+        pipeline.plan()
+        pipelines.append(pipeline)
+
+    with report.stage('plan'):
+        jobs = {}
+        for pipeline in pipelines:
+            jobs.update(dict.fromkeys(pipeline.pending()))
+        preshaped = preshape_jobs(engine.process, jobs, workers)
+
+    for pipeline in pipelines:
+        pipeline.use_preshaped(preshaped)
+        try:
+            pipeline.write()
+        finally:
+            pipeline.report.stop()
+    report.stop()
+    return pipelines
+
+
+def process_text(text, min_len, max_len, linebreaker):
+    if is_missing(text):
+        return ""
+
+    text = str(text)
+
+    # شکستن خط (اگر min=0 و max=0 نباشد)، اصلاح حروف عربی/فارسی و معکوس کردن جملات
+    # در یک گذر روی هر خط
+    return shape_text(text, min_len, max_len, linebreaker)
+
+
+# موتور شکل‌دهی پیش‌فرض با کش LRU؛ بین اجراها گرم می‌ماند
+shaping_engine = ShapingEngine(process_text)
+
+
+def add_linebreaks(text, min_len, max_len, linebreaker):
+    output_lines = []
+
+    for line in str(text).splitlines():
+        if arabic_regex.search(line):
+            line = linebreaker.join(wrap_line(line, min_len, max_len))
+        output_lines.append(line)
+
+    return '\n'.join(output_lines)
+
+
+def reshape_arabic(text):
+    # اصلاح حروف و ترتیب نمایش هر خط با مسیر شکل‌دهی فعال (shaping_backends)
+    output_lines = []
+
+    for line in str(text).splitlines():
+        if arabic_regex.search(line):
+            line = display_line(line)
+        output_lines.append(line)
+
+    return '\n'.join(output_lines)
+
+
+def rearrange_sentences(text, linebreaker):
+    output_lines = []
+
+    for line in str(text).splitlines():
+        if arabic_regex.search(line):
+            sentences = [s.strip() for s in line.split(linebreaker) if s.strip()]
+            sentences.reverse()
+            line = linebreaker.join(sentences)
+        output_lines.append(line)
+
+    return '\n'.join(output_lines)
+
+
+def convert_special_chars(text):
+    """
+    تبدیل کاراکترهای خاص به entityهای XML با ترتیب صحیح (& اول از همه، \\n در انتها)
+    """
+    if not isinstance(text, str):
+        text = str(text)
+
+    return escape_value(text)
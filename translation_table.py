@@ -0,0 +1,66 @@
+from excel_loader import read_excel_mappings
+from text_shaper import id_layouts
+
+
+class TranslationTable:
+    """
+    جدول فشرده ترجمه با آرایه‌های موازی و یک شاخص کلید → ردیف.
+    فقط کلیدهایی که ID دارند (ستون 3) ردیف می‌گیرند؛ برای هر ردیف متن ترجمه (None یعنی
+    مقدار اصلی XML)، ID و حداقل و حداکثر طول (None برای ID بدون ردیف تنظیمات) نگه داشته
+    می‌شود. جایگزین سه دیکشنری key_to_id، key_to_text و id_settings.
+    """
+
+    __slots__ = ('index', 'keys', 'texts', 'ids', 'min_lens', 'max_lens')
+
+    def __init__(self, id_settings, key_to_id, key_to_text):
+        layouts = id_layouts(id_settings)
+        self.index = {}
+        self.keys = []
+        self.texts = []
+        self.ids = []
+        self.min_lens = []
+        self.max_lens = []
+
+        for row, (key, id_val) in enumerate(key_to_id.items()):
+            min_len, max_len = layouts.get(id_val, (None, None))
+            self.index[key] = row
+            self.keys.append(key)
+            self.texts.append(key_to_text.get(key))
+            self.ids.append(id_val)
+            self.min_lens.append(min_len)
+            self.max_lens.append(max_len)
+
+    @classmethod
+    def from_mappings(cls, mappings):
+        # از خروجی read_excel_mappings: (id_settings, valid_ids, key_to_id, key_to_text)
+        id_settings, _, key_to_id, key_to_text = mappings
+        return cls(id_settings, key_to_id, key_to_text)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, key):
+        return key in self.index
+
+    def resolve(self, key, original_value):
+        """
+        متن و محدودیت طول یک آیتم XML: (text, id_val, min_len, max_len)،
+        یا None اگر کلید در جدول نیست یا ID آن ردیف تنظیمات ندارد (آیتم بدون تغییر می‌ماند).
+        """
+        row = self.index.get(key)
+        if row is None:
+            return None
+        min_len = self.min_lens[row]
+        if min_len is None:
+            return None
+        text = self.texts[row]
+        if text is None:
+            text = original_value
+        return text, self.ids[row], min_len, self.max_lens[row]
+
+
+def load_table(excel_path, refresh_cache=False, progress=None, cancel=None):
+    # خواندن فایل اکسل (یا کش آن) و ساخت جدول؛ دیکشنری‌های میانی بلافاصله آزاد می‌شوند.
+    # progress(done, total) ردیف‌های خوانده‌شده را گزارش می‌کند و cancel مثل read_excel_mappings است
+    return TranslationTable.from_mappings(read_excel_mappings(excel_path, refresh_cache=refresh_cache,
+                                                              progress=progress, cancel=cancel))
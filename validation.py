@@ -0,0 +1,131 @@
+import csv
+import functools
+import json
+import os
+
+from text_shaper import DEFAULT_CACHE_SIZE, arabic_regex, is_missing, wrap_line
+from xml_escape import unescape_value
+
+# انواع مشکل
+OVERFLOW = 'overflow'              # خطی از متن نهایی بلندتر از max_len است
+HARD_SPLIT = 'hard_split'          # فاصله‌ای بین min_len و max_len نبود و خط وسط کلمه شکسته شد
+MISSING_IN_XML = 'missing_in_xml'  # کلید اکسل در فایل XML وجود ندارد
+UNKNOWN_ID = 'unknown_id'          # ID کلید نه صفر است و نه ردیف تنظیمات دارد
+
+FIELDS = ('job', 'key', 'issue', 'id', 'min_len', 'max_len', 'detail')
+
+
+class ValidationReport:
+    """
+    گزارش کنترل کیفیت ترجمه که در همان گذر پردازش XML ساخته می‌شود:
+    خطوط بلندتر از max_len، شکستن اجباری خط، کلیدهای اکسل غایب در XML و IDهای بدون تنظیمات.
+    برای چند کار (حالت دسته‌ای) می‌توان یک گزارش مشترک داشت؛ هر ردیف نام خروجی کار را دارد.
+    """
+
+    def __init__(self):
+        self.issues = []
+        self.job = None
+        self._seen = set()
+
+    def begin(self, job):
+        self.job = job
+        self._seen = set()
+
+    def see(self, key):
+        self._seen.add(key)
+
+    def check(self, key, text, id_val, min_len, max_len, value):
+        # value مقدار نهایی (escape شده) است؛ برای مقادیر استفاده‌شده از خروجی قبلی هم کار می‌کند
+        if max_len > 0:
+            longest = max(map(len, unescape_value(value).split('\n')))
+            if longest > max_len:
+                self._add(key, OVERFLOW, id_val, min_len, max_len, longest)
+
+        splits = hard_splits(text, min_len, max_len)
+        if splits:
+            self._add(key, HARD_SPLIT, id_val, min_len, max_len, splits)
+
+    def finish(self, table):
+        # بعد از گذر XML: کلیدهای جدول که دیده نشدند و IDهای بدون ردیف تنظیمات
+        for row, key in enumerate(table.keys):
+            if table.min_lens[row] is None:
+                self._add(key, UNKNOWN_ID, table.ids[row], None, None, '')
+            elif key not in self._seen:
+                self._add(key, MISSING_IN_XML, table.ids[row], table.min_lens[row], table.max_lens[row], '')
+        self._seen = set()
+
+    def counts(self):
+        counts = {}
+        for issue in self.issues:
+            counts[issue['issue']] = counts.get(issue['issue'], 0) + 1
+        return counts
+
+    def summary(self):
+        counts = self.counts()
+        return (
+            f"کنترل کیفیت: {counts.get(OVERFLOW, 0)} خط بلندتر از حداکثر، "
+            f"{counts.get(HARD_SPLIT, 0)} شکستن اجباری، "
+            f"{counts.get(MISSING_IN_XML, 0)} کلید غایب در XML، "
+            f"{counts.get(UNKNOWN_ID, 0)} ID بدون تنظیمات"
+        )
+
+    def write(self, path):
+        # قالب بر اساس پسوند: .json یا CSV (پیش‌فرض)
+        if os.path.splitext(path)[1].lower() == '.json':
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({'counts': self.counts(), 'issues': self.issues}, f, ensure_ascii=False, indent=2)
+        else:
+            with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=FIELDS)
+                writer.writeheader()
+                writer.writerows(self.issues)
+
+    def _add(self, key, issue, id_val, min_len, max_len, detail):
+        self.issues.append({
+            'job': self.job,
+            'key': key,
+            'issue': issue,
+            'id': id_val,
+            'min_len': min_len,
+            'max_len': max_len,
+            'detail': detail,
+        })
+
+
+class NullValidation:
+    # جایگزین بی‌اثر ValidationReport وقتی کنترل کیفیت خواسته نشده است
+
+    def begin(self, job):
+        pass
+
+    def see(self, key):
+        pass
+
+    def check(self, key, text, id_val, min_len, max_len, value):
+        pass
+
+    def finish(self, table):
+        pass
+
+
+NULL_VALIDATION = NullValidation()
+
+
+@functools.lru_cache(maxsize=DEFAULT_CACHE_SIZE)
+def hard_splits(text, min_len, max_len):
+    """
+    تعداد شکستن‌های اجباری (split_pos = max_len) هنگام شکستن خطوط فارسی/عربی text.
+    شکستن در فاصله همیشه تکه‌ای کوتاه‌تر از max_len می‌دهد، پس هر تکه غیرآخر با طول
+    دقیقاً max_len یعنی فاصله‌ای پیدا نشده است.
+    """
+    if not (min_len > 0 and max_len > 0 and max_len > min_len):
+        return 0
+    if not isinstance(text, str):
+        text = "" if is_missing(text) else str(text)
+
+    count = 0
+    for line in text.splitlines():
+        if arabic_regex.search(line):
+            parts = wrap_line(line, min_len, max_len)
+            count += sum(1 for part in parts[:-1] if len(part) == max_len)
+    return count
@@ -0,0 +1,57 @@
+# جایگزینی‌های entity به ترتیب؛ & باید اول باشد تا entityهای ساخته‌شده دوباره escape نشوند.
+# این تنها فهرست entityهاست: زنجیره escape_value باز شده همین فهرست است و بررسی پایین
+# فایل هماهنگی آن‌ها را هنگام import تضمین می‌کند.
+ESCAPES = (
+    ("&", "&amp;"),
+    ("<", "&lt;"),
+    (">", "&gt;"),
+    ('"', "&quot;"),
+    ("'", "&apos;"),
+    ("\n", "&#10;"),
+)
+
+
+def escape_value(text):
+    """
+    تبدیل کاراکترهای خاص مقدار ویژگی XML به entity.
+    در CPython وقتی کاراکتری پیدا نشود str.replace همان شیء را برمی‌گرداند، پس برای
+    بیشتر مقادیر (بدون کاراکتر خاص) هیچ کپی‌ای ساخته نمی‌شود؛ این زنجیره از
+    str.translate و re.sub با نگاشت سریع‌تر است (benchmarks/bench_escape.py).
+    """
+    # همان ESCAPES به همان ترتیب؛ با هر تغییر در ESCAPES این زنجیره هم باید تغییر کند
+    return (
+        text.replace("&", "&amp;")
+        .replace("<", "&lt;")
+        .replace(">", "&gt;")
+        .replace('"', "&quot;")
+        .replace("'", "&apos;")
+        .replace("\n", "&#10;")
+    )
+
+
+def escape_values(values):
+    """
+    escape گروهی یک لیست رشته (برای مسیرهای دسته‌ای و موازی).
+    اتصال همه مقادیر و یک بار escape و split کردن آن‌ها کندتر از همین حلقه بود،
+    چون split دوباره همه رشته‌ها را می‌سازد.
+    """
+    return list(map(escape_value, values))
+
+
+def unescape_value(value):
+    """
+    عکس escape_value. چون هر & در مقدار escape شده آغاز یکی از همین entityهاست،
+    جایگزینی به ترتیب معکوس (&amp; در آخر) دقیقاً متن اصلی را برمی‌گرداند.
+    """
+    for char, entity in reversed(ESCAPES):
+        value = value.replace(entity, char)
+    return value
+
+
+# زنجیره باز شده escape_value باید دقیقاً ESCAPES (با همان ترتیب) باشد: همه کاراکترهای ASCII
+# فقط طبق ESCAPES تبدیل شوند. اگر & اول نباشد entityهای بعدی دوباره escape می‌شوند و
+# کاراکتری که فقط در یکی از دو فهرست باشد هم همین‌جا پیدا می‌شود
+_ENTITIES = dict(ESCAPES)
+assert escape_value(''.join(map(chr, range(128)))) == ''.join(_ENTITIES.get(chr(code), chr(code))
+                                                               for code in range(128)), \
+    "escape_value با ESCAPES هماهنگ نیست"
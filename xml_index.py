@@ -0,0 +1,196 @@
+import json
+import mmap
+import os
+
+from atomic_output import AtomicOutput, file_sha256, save_json
+from run_report import NULL_REPORT
+from xml_rewriter import item_pattern
+
+# نسخه قالب فایل شاخص؛ با تغییر ساختار باید افزایش یابد
+INDEX_VERSION = 1
+INDEX_SUFFIX = ".index"
+
+
+class XmlIndex:
+    """
+    شاخص آیتم‌های فایل XML مبدأ: برای هر آیتم (به ترتیب فایل) کلید، مقدار اصلی و
+    بازه بایتی کل تگ <item .../> نگه داشته می‌شود. با آن، بازنویسی بدون اجرای regex روی
+    کل سند انجام می‌شود و بایت‌های بین آیتم‌های تغییرنکرده یکجا کپی می‌شوند.
+    """
+
+    __slots__ = ('xml_path', 'items', 'has_cr', 'signature')
+
+    def __init__(self, xml_path, items, has_cr, signature):
+        self.xml_path = xml_path
+        self.items = items
+        self.has_cr = has_cr
+        self.signature = signature
+
+    def __len__(self):
+        return len(self.items)
+
+    def keys(self):
+        return [item[0] for item in self.items]
+
+
+class _IndexedMatch:
+    # جایگزین re.Match برای replace_item؛ فقط group(0..2) لازم است
+    __slots__ = ('_groups',)
+
+    def __init__(self, item_text, key, value):
+        self._groups = (item_text, key, value)
+
+    def group(self, index=0):
+        return self._groups[index]
+
+
+def index_path_for(xml_path):
+    return os.path.abspath(xml_path) + INDEX_SUFFIX
+
+
+def load_index(xml_path, refresh=False):
+    """
+    شاخص فایل XML از فایل کناری (xml_path + '.index') یا ساخت و ذخیره دوباره آن.
+    شاخص با اندازه، زمان تغییر و هش محتوای فایل مبدأ اعتبارسنجی می‌شود.
+    """
+    signature = _source_signature(xml_path)
+    sidecar = index_path_for(xml_path)
+
+    if not refresh:
+        try:
+            with open(sidecar, 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+            if stored.get('version') == INDEX_VERSION and stored.get('source') == signature:
+                items = [tuple(item) for item in stored['items']]
+                return XmlIndex(xml_path, items, stored['has_cr'], signature)
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+    index = build_index(xml_path, signature)
+    _save_index(index, sidecar)
+    return index
+
+
+def build_index(xml_path, signature=None):
+    # regex روی متن (مثل مسیر معمولی) اجرا و موقعیت کاراکتری به بایت تبدیل می‌شود
+    with open(xml_path, 'rb') as f:
+        text = f.read().decode('utf-8')
+
+    items = []
+    byte_pos = 0
+    char_pos = 0
+    for match in item_pattern.finditer(text):
+        start, end = match.span()
+        byte_start = byte_pos + len(text[char_pos:start].encode('utf-8'))
+        byte_end = byte_start + len(match.group(0).encode('utf-8'))
+        items.append((match.group(1), match.group(2), byte_start, byte_end))
+        byte_pos, char_pos = byte_end, end
+
+    return XmlIndex(xml_path, items, '\r' in text, signature or _source_signature(xml_path))
+
+
+def rewrite_indexed(index, output_xml_path, replace_item, report=NULL_REPORT):
+    """
+    بازنویسی فایل مبدأ شاخص با replace_item بدون regex: فقط آیتم‌هایی که خروجی‌شان با
+    متن اصلی فرق دارد نوشته می‌شوند و بقیه بازه‌ها با os.sendfile (یا mmap) کپی می‌شوند.
+    خروجی بایت به بایت با rewrite_xml یکسان است، از جمله تبدیل پایان خط حالت متنی.
+    مقدار برگشتی مثل rewrite_xml: False یعنی خروجی موجود همین محتوا را داشت.
+    """
+    # حالت متنی پایتون \r\n و \r را هنگام خواندن و \n را هنگام نوشتن به os.linesep تبدیل می‌کند
+    translate = index.has_cr or os.linesep != '\n'
+
+    # مبدأ، mmap و memoryview آن پیش از جایگزینی خروجی بسته می‌شوند: در ویندوز فایل باز یا
+    # نگاشت‌شده را نمی‌توان جایگزین کرد و ورودی و خروجی ممکن است یک فایل باشند
+    with report.stage('write'):
+        with AtomicOutput(output_xml_path, 'wb', report) as output:
+            with open(index.xml_path, 'rb') as src:
+                size = os.fstat(src.fileno()).st_size
+                source = mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+                try:
+                    with report.stage('rewrite'):
+                        segments = _plan_segments(index, source, replace_item, translate)
+                    _write_segments(src, source, size, output.file, segments, translate)
+                finally:
+                    if size:
+                        source.close()
+    return output.changed
+
+
+def _plan_segments(index, source, replace_item, translate):
+    # لیست بازه‌های کپی (start, end) و رشته‌های جدید؛ بازه‌های پشت سر هم ادغام می‌شوند
+    segments = []
+    copy_start = 0
+    for key, value, start, end in index.items:
+        item_text = source[start:end].decode('utf-8')
+        if translate:
+            item_text, key, value = (_translate_newlines(part) for part in (item_text, key, value))
+        record = replace_item(_IndexedMatch(item_text, key, value))
+        if record == item_text:
+            continue
+        if start > copy_start:
+            segments.append((copy_start, start))
+        segments.append(record)
+        copy_start = end
+    segments.append((copy_start, len(source)))
+    return segments
+
+
+def _write_segments(src, source, size, dst, segments, translate):
+    view = memoryview(source) if size else b''
+    try:
+        for segment in segments:
+            if isinstance(segment, str):
+                if translate:
+                    segment = segment.replace('\n', os.linesep)
+                dst.write(segment.encode('utf-8'))
+                continue
+            start, end = segment
+            if start >= end:
+                continue
+            if translate:
+                dst.write(_translate_bytes(bytes(view[start:end])))
+            elif hasattr(os, 'sendfile'):
+                dst.flush()
+                _sendfile(dst.fileno(), src.fileno(), start, end - start)
+            else:
+                dst.write(view[start:end])
+    finally:
+        if size:
+            view.release()
+
+
+def _sendfile(out_fd, in_fd, offset, count):
+    while count > 0:
+        sent = os.sendfile(out_fd, in_fd, offset, count)
+        if sent == 0:
+            raise OSError("os.sendfile: پایان غیرمنتظره فایل مبدأ")
+        offset += sent
+        count -= sent
+
+
+def _translate_newlines(text):
+    return text.replace('\r\n', '\n').replace('\r', '\n')
+
+
+def _translate_bytes(data):
+    # \r و \n هیچ‌وقت داخل دنباله چندبایتی UTF-8 نمی‌آیند، پس تبدیل روی بایت‌ها امن است
+    data = data.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+    if os.linesep != '\n':
+        data = data.replace(b'\n', os.linesep.encode('ascii'))
+    return data
+
+
+def _source_signature(xml_path):
+    stat = os.stat(xml_path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': file_sha256(xml_path)}
+
+
+def _save_index(index, sidecar):
+    # مثل کش اکسل: نوشتن اتمیک و نادیده گرفتن پوشه فقط‌خواندنی
+    data = {
+        'version': INDEX_VERSION,
+        'source': index.signature,
+        'has_cr': index.has_cr,
+        'items': index.items,
+    }
+    save_json(sidecar, data)
@@ -0,0 +1,129 @@
+import re
+
+from atomic_output import AtomicOutput
+from run_report import NULL_REPORT
+
+# الگو برای یافتن آیتم‌های LocDictionary
+item_pattern = re.compile(r'<item\s+key="([^"]+)"\s+value="([^"]*)"\s*/>')
+
+# اندازه هر تکه خواندن در حالت جریانی (کاراکتر)
+STREAM_CHUNK_SIZE = 1 << 16
+
+
+# فاصله گزارش پیشرفت (تعداد آیتم)
+PROGRESS_INTERVAL = 50
+
+
+class ProcessingCancelled(Exception):
+    pass
+
+
+def rewrite_xml(xml_path, output_xml_path, replace_item, stream=False, progress=None, cancel=None,
+                report=NULL_REPORT, index=None):
+    """
+    اعمال replace_item روی تمام آیتم‌های فایل XML و ذخیره نتیجه.
+    خروجی همیشه با AtomicOutput نوشته می‌شود: فایل موقت کنار خروجی فقط در پایان جایگزین
+    آن می‌شود و اگر محتوا با خروجی موجود یکی باشد اصلاً جایگزین نمی‌شود.
+    در حالت stream فایل تکه‌تکه خوانده و نوشته می‌شود تا مصرف حافظه مستقل از اندازه فایل باشد.
+    با index (شاخص xml_index.XmlIndex همین فایل) regex اجرا نمی‌شود و فقط آیتم‌های
+    تغییرکرده نوشته و بقیه فایل به صورت بازه‌های بایتی کپی می‌شود.
+    progress(done, total) پیشرفت آیتم‌ها را گزارش می‌کند و اگر cancel() مقدار True برگرداند
+    ProcessingCancelled رخ می‌دهد و فایل خروجی دست نمی‌خورد.
+    زمان خواندن، جایگزینی (item_pattern.sub) و نوشتن در report ثبت می‌شود.
+    مقدار برگشتی False یعنی خروجی از قبل همین محتوا را داشت و دست نخورد.
+    """
+    if progress is not None or cancel is not None:
+        if progress is None:
+            total = 0
+        elif index is not None:
+            total = len(index)
+        else:
+            total = count_items(xml_path)
+        replace_item = _tracked(replace_item, total, progress, cancel)
+
+    if index is not None:
+        from xml_index import rewrite_indexed
+        changed = rewrite_indexed(index, output_xml_path, replace_item, report)
+    elif stream:
+        changed = _rewrite_stream(xml_path, output_xml_path, replace_item, report)
+    else:
+        with report.stage('read'):
+            with open(xml_path, 'r', encoding='utf-8') as f:
+                xml_content = f.read()
+
+        with report.stage('rewrite'):
+            processed_xml = item_pattern.sub(replace_item, xml_content)
+
+        with report.stage('write'):
+            with AtomicOutput(output_xml_path, 'w', report) as output:
+                output.file.write(processed_xml)
+        changed = output.changed
+
+    if progress is not None:
+        progress(replace_item.done, replace_item.total)
+    return changed
+
+
+def count_items(xml_path):
+    # شمارش سریع آیتم‌ها برای نوار پیشرفت، بدون اجرای regex
+    count = 0
+    with open(xml_path, 'r', encoding='utf-8') as src:
+        for segment in _iter_segments(src):
+            count += segment.count('<item')
+    return count
+
+
+def _tracked(replace_item, total, progress, cancel):
+    def tracked(match):
+        if tracked.done % PROGRESS_INTERVAL == 0:
+            if cancel is not None and cancel():
+                raise ProcessingCancelled()
+            if progress is not None:
+                progress(tracked.done, total)
+        tracked.done += 1
+        return replace_item(match)
+
+    tracked.done = 0
+    tracked.total = total
+    return tracked
+
+
+def iter_items(xml_path):
+    # پیمایش جریانی آیتم‌ها (match) بدون خواندن کامل فایل در حافظه
+    with open(xml_path, 'r', encoding='utf-8') as src:
+        for segment in _iter_segments(src):
+            yield from item_pattern.finditer(segment)
+
+
+def _rewrite_stream(xml_path, output_xml_path, replace_item, report=NULL_REPORT):
+    # ورودی و خروجی می‌توانند یک فایل باشند؛ ورودی تا پایان خواندن دست نمی‌خورد و پیش از
+    # جایگزینی خروجی بسته می‌شود (در ویندوز فایل باز را نمی‌توان جایگزین کرد)
+    with AtomicOutput(output_xml_path, 'w', report) as output:
+        with open(xml_path, 'r', encoding='utf-8') as src:
+            for segment in _iter_segments(src):
+                with report.stage('rewrite'):
+                    processed_segment = item_pattern.sub(replace_item, segment)
+                with report.stage('write'):
+                    output.file.write(processed_segment)
+    return output.changed
+
+
+def _iter_segments(src, chunk_size=None):
+    # بافر همیشه در آخرین '<' بریده می‌شود؛ چون '<' خام داخل مقدار ویژگی XML مجاز نیست،
+    # هیچ آیتمی بین دو تکه نصف نمی‌شود و خروجی با sub روی کل فایل یکسان است
+    chunk_size = chunk_size or STREAM_CHUNK_SIZE
+    tail = ''
+    while True:
+        chunk = src.read(chunk_size)
+        if not chunk:
+            break
+        buffer = tail + chunk
+        cut = buffer.rfind('<')
+        if cut == -1:
+            cut = len(buffer)
+        if cut > 0:
+            yield buffer[:cut]
+        tail = buffer[cut:]
+    if tail:
+        yield tail
+